@@ -1,6 +1,8 @@
 """Alarm manager for tracking alarms and enforcing failsafe."""
 import logging
-from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, Mapping, Optional, List, Tuple
 from datetime import datetime
 from app.redis_client import AutomationRedisClient
 from app.database import DatabaseManager
@@ -8,6 +10,20 @@ from app.database import DatabaseManager
 logger = logging.getLogger(__name__)
 
 
+@dataclass(slots=True)
+class Alarm:
+    """Active alarm."""
+    location: str
+    cluster: str
+    alarm_name: str
+    severity: str
+    message: str
+    active: bool = True
+    # Only known for alarms read back from Redis
+    since: Optional[int] = None  # Timestamp (ms) the alarm was first raised
+    acknowledged: bool = False
+
+
 class AlarmManager:
     """Manages alarms and failsafe enforcement."""
     
@@ -24,7 +40,7 @@ class AlarmManager:
         """
         self.redis_client = redis_client
         self.database = database
-        self._active_alarms: Dict[str, Dict[str, Any]] = {}  # Cache of active alarms
+        self._active_alarms: Dict[Tuple[str, str, str], Alarm] = {}  # Cache of active alarms
     
     def raise_alarm(
         self,
@@ -51,15 +67,7 @@ class AlarmManager:
         
         if success:
             # Cache alarm
-            key = f"{location}:{cluster}:{alarm_name}"
-            self._active_alarms[key] = {
-                'location': location,
-                'cluster': cluster,
-                'alarm_name': alarm_name,
-                'severity': severity,
-                'message': message,
-                'active': True
-            }
+            self._cache_alarm(location, cluster, alarm_name, severity, message)
             
             # If critical, trigger failsafe
             if severity == 'critical':
@@ -72,6 +80,52 @@ class AlarmManager:
         
         return success
     
+    def raise_alarms(self, alarms: Iterable[Tuple[str, str, str, str, str]]) -> List[bool]:
+        """Raise several alarms with one batched Redis write.
+        
+        Failsafe is triggered once per location/cluster that has a critical
+        alarm in the batch, rather than once per alarm.
+        
+        Args:
+            alarms: Iterable of (location, cluster, alarm_name, severity, message) tuples
+        
+        Returns:
+            List of success flags, one per alarm
+        """
+        alarms = list(alarms)
+        if not alarms:
+            return []
+        
+        # Write to Redis
+        success = self.redis_client.write_alarms(alarms)
+        if not success:
+            return [False] * len(alarms)
+        
+        critical_clusters: Dict[Tuple[str, str], str] = {}
+        for location, cluster, alarm_name, severity, message in alarms:
+            self._cache_alarm(location, cluster, alarm_name, severity, message)
+            if severity == 'critical':
+                critical_clusters.setdefault((location, cluster), alarm_name)
+        
+        # If critical, trigger failsafe
+        for (location, cluster), alarm_name in critical_clusters.items():
+            self._trigger_failsafe(location, cluster, 'critical_alarm', alarm_name)
+        
+        return [True] * len(alarms)
+    
+    def _cache_alarm(
+        self,
+        location: str,
+        cluster: str,
+        alarm_name: str,
+        severity: str,
+        message: str
+    ) -> None:
+        """Add or update an alarm in the cache."""
+        self._active_alarms[(location, cluster, alarm_name)] = Alarm(
+            location, cluster, alarm_name, severity, message
+        )
+    
     def clear_alarm(
         self,
         location: str,
@@ -92,8 +146,7 @@ class AlarmManager:
         
         if success:
             # Remove from cache
-            key = f"{location}:{cluster}:{alarm_name}"
-            self._active_alarms.pop(key, None)
+            self._active_alarms.pop((location, cluster, alarm_name), None)
         
         return success
     
@@ -118,23 +171,42 @@ class AlarmManager:
     def get_alarms(
         self,
         location: Optional[str] = None,
-        cluster: Optional[str] = None
-    ) -> Dict[str, Dict[str, Any]]:
+        cluster: Optional[str] = None,
+        copy: bool = False
+    ) -> Mapping[Tuple[str, str, str], Alarm]:
         """Get all active alarms.
         
+        Without a location/cluster filter this returns a live read-only view of
+        the cache instead of a per-call copy; callers must not mutate the Alarm
+        objects it contains.
+        
         Args:
             location: Optional location filter
             cluster: Optional cluster filter
+            copy: Return a plain dict snapshot instead of the cache view
         
         Returns:
-            Dict mapping alarm key to alarm data
+            Mapping of (location, cluster, alarm_name) to Alarm. With a filter
+            the alarms are read from Redis; without one they come from the cache.
         """
         if location and cluster:
-            return self.redis_client.read_alarms(location, cluster)
+            return {
+                (location, cluster, alarm_name): Alarm(
+                    location, cluster, alarm_name,
+                    alarm_data.get('severity'),
+                    alarm_data.get('message'),
+                    alarm_data.get('active', False),
+                    alarm_data.get('since'),
+                    alarm_data.get('acknowledged', False)
+                )
+                for alarm_name, alarm_data in self.redis_client.read_alarms(location, cluster).items()
+            }
         
         # Get all alarms (would need to scan all locations/clusters)
         # For now, return cached alarms
-        return self._active_alarms.copy()
+        if copy:
+            return dict(self._active_alarms)
+        return MappingProxyType(self._active_alarms)
     
     def check_critical_alarms(
         self,
@@ -216,4 +288,3 @@ class AlarmManager:
         # For now, alarms are read directly from Redis
         # Cache update could be implemented if needed for performance
         pass
-
@@ -1,9 +1,11 @@
 """Interlock manager for safety interlocks."""
 import logging
-from typing import Dict, List, Optional, Set, Tuple, Callable
+from typing import Any, Dict, List, Optional, Tuple, Callable
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 class InterlockManager:
     """Manages device interlocks to prevent conflicting states."""
@@ -29,8 +31,13 @@ class InterlockManager:
         logger.info("Initialized interlock manager with load-based interlock support")
     
     def _build_interlock_map(self):
-        """Build interlock mapping from config."""
-        self._interlock_map: Dict[Tuple[str, str, str], Set[str]] = {}
+        """Build interlock mapping from config.
+        
+        Each device maps to a flat tuple of (interlock_key, interlock_device,
+        max_allowed_load) entries so check_interlock never walks the nested
+        device config.
+        """
+        self._interlock_map: Dict[Tuple[str, str, str], Tuple[Tuple[Tuple[str, str, str], str, float], ...]] = {}
         
         # Build from per-device interlock_with
         for location, clusters in self.device_config.items():
@@ -39,12 +46,22 @@ class InterlockManager:
                     interlock_with = device_info.get('interlock_with', [])
                     if interlock_with:
                         key = (location, cluster, device_name)
-                        self._interlock_map[key] = set(interlock_with)
+                        entries = []
+                        for interlock_device in dict.fromkeys(interlock_with):
+                            # Max allowed load of the interlocked device (default: 0% = full interlock)
+                            interlock_device_info = devices.get(interlock_device) or {}
+                            max_allowed_load = interlock_device_info.get('interlock_max_allowed_load', 0.0)
+                            entries.append(((location, cluster, interlock_device), interlock_device, max_allowed_load))
+                        self._interlock_map[key] = tuple(entries)
         
-        # Add global interlock rules
+        # Index global interlock rules by the devices they reference
+        self._global_by_device: Dict[str, List[Dict[str, Any]]] = {}
         for rule in self.interlock_rules:
             when_device = rule.get('when_device')
             then_device = rule.get('then_device')
+            for referenced_device in dict.fromkeys((when_device, then_device)):
+                if referenced_device is not None:
+                    self._global_by_device.setdefault(referenced_device, []).append(rule)
             if when_device and then_device:
                 # Apply to all locations/clusters (simplified)
                 # In practice, might need location/cluster context
@@ -56,7 +73,8 @@ class InterlockManager:
         cluster: str,
         device_name: str,
         device_states: Dict[Tuple[str, str, str], int],
-        requested_load: Optional[float] = None
+        requested_load: Optional[float] = None,
+        load_cache: Optional[Dict[Tuple[str, str, str], Optional[float]]] = None
     ) -> Tuple[bool, Optional[str]]:
         """Check if device can be turned on or set to requested load (not blocked by interlock).
         
@@ -66,66 +84,76 @@ class InterlockManager:
             device_name: Device name
             device_states: Dict mapping (location, cluster, device) -> state (0/1)
             requested_load: Optional requested load percentage (0-100) for the device being checked
+            load_cache: Optional dict memoizing device_load_callback results; pass the same
+                        dict to several calls in one control tick to share lookups
         
         Returns:
             Tuple of (can_turn_on, reason)
         """
         key = (location, cluster, device_name)
+        if load_cache is None:
+            load_cache = {}
         
         # Check per-device interlocks
-        interlock_devices = self._interlock_map.get(key, set())
-        for interlock_device in interlock_devices:
-            interlock_key = (location, cluster, interlock_device)
-            interlock_state = device_states.get(interlock_key, 0)
+        for interlock_key, interlock_device, max_allowed_load in self._interlock_map.get(key, ()):
+            # Only an interlocked device that is ON can block
+            if device_states.get(interlock_key, 0) != 1:
+                continue
             
             # Get interlock device load if callback available
-            interlock_load = None
-            if self.device_load_callback and interlock_state == 1:
-                interlock_load = self.device_load_callback(location, cluster, interlock_device)
+            interlock_load = self._get_load(interlock_key, load_cache) if self.device_load_callback else None
             
-            # Check if interlocked device is ON
-            if interlock_state == 1:
-                # If we have load information, check if it exceeds threshold
-                if interlock_load is not None:
-                    # Get max allowed load from device config (default: 0% = full interlock)
-                    interlock_device_info = self.device_config.get(location, {}).get(cluster, {}).get(interlock_device, {})
-                    max_allowed_load = interlock_device_info.get('interlock_max_allowed_load', 0.0)
-                    
-                    if interlock_load > max_allowed_load:
-                        return (False, f"Interlock: {interlock_device} is at {interlock_load:.1f}% (max allowed: {max_allowed_load:.1f}%)")
-                else:
-                    # No load info available, use traditional ON/OFF check
-                    return (False, f"Interlock: {interlock_device} is ON")
+            if interlock_load is None:
+                # No load info available, use traditional ON/OFF check
+                return (False, f"Interlock: {interlock_device} is ON")
+            if interlock_load > max_allowed_load:
+                return (False, f"Interlock: {interlock_device} is at {interlock_load:.1f}% (max allowed: {max_allowed_load:.1f}%)")
         
-        # Check global interlock rules
-        for rule in self.interlock_rules:
+        # Check global interlock rules that reference this device
+        for rule in self._global_by_device.get(device_name, ()):
             when_device = rule.get('when_device')
+            
+            # Only a "when" device that is ON can block
+            when_key = (location, cluster, when_device)
+            if device_states.get(when_key, 0) != 1:
+                continue
+            
             then_device = rule.get('then_device')
             max_allowed_load = rule.get('max_allowed_load', 0.0)  # Default: 0% = full interlock
             
-            if when_device == device_name or then_device == device_name:
-                # Check if the "when" device is ON
-                when_key = (location, cluster, when_device)
-                when_state = device_states.get(when_key, 0)
-                
-                if when_state == 1:
-                    # Get load of "when" device if callback available
-                    when_load = None
-                    if self.device_load_callback:
-                        when_load = self.device_load_callback(location, cluster, when_device)
-                    
-                    if then_device == device_name:
-                        # This device is blocked by "when" device
-                        if when_load is not None:
-                            if when_load > max_allowed_load:
-                                return (False, f"Global interlock: {when_device} is at {when_load:.1f}% (max allowed: {max_allowed_load:.1f}%)")
-                        else:
-                            return (False, f"Global interlock: {when_device} is ON")
-                    
-                    # Also check if requested load would violate interlock
-                    if requested_load is not None and requested_load > max_allowed_load:
-                        if when_load is not None and when_load > max_allowed_load:
-                            return (False, f"Global interlock: Cannot set {device_name} to {requested_load:.1f}% (max allowed: {max_allowed_load:.1f}%) when {when_device} is at {when_load:.1f}%")
+            # Get load of "when" device if callback available
+            when_load = self._get_load(when_key, load_cache) if self.device_load_callback else None
+            
+            if then_device == device_name:
+                # This device is blocked by "when" device
+                if when_load is None:
+                    return (False, f"Global interlock: {when_device} is ON")
+                if when_load > max_allowed_load:
+                    return (False, f"Global interlock: {when_device} is at {when_load:.1f}% (max allowed: {max_allowed_load:.1f}%)")
+            
+            # Also check if requested load would violate interlock
+            if (requested_load is not None and requested_load > max_allowed_load and
+                    when_load is not None and when_load > max_allowed_load):
+                return (False, f"Global interlock: Cannot set {device_name} to {requested_load:.1f}% (max allowed: {max_allowed_load:.1f}%) when {when_device} is at {when_load:.1f}%")
         
         return (True, None)
-
+    
+    def _get_load(
+        self,
+        device_key: Tuple[str, str, str],
+        load_cache: Dict[Tuple[str, str, str], Optional[float]]
+    ) -> Optional[float]:
+        """Get device load via the callback, memoized in load_cache.
+        
+        Args:
+            device_key: (location, cluster, device_name)
+            load_cache: Dict of already fetched loads
+        
+        Returns:
+            Load percentage (0-100) or None if not available
+        """
+        load = load_cache.get(device_key, _MISSING)
+        if load is _MISSING:
+            load = self.device_load_callback(*device_key)
+            load_cache[device_key] = load
+        return load
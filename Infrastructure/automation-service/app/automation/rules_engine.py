@@ -1,11 +1,32 @@
 """Rules engine for if-then automation rules."""
 import logging
-from typing import Dict, List, Optional, Tuple
+import operator
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
 
+def _approx_equal(a: float, b: float) -> bool:
+    """Float equality with 0.01 tolerance."""
+    return abs(a - b) < 0.01
+
+
+ConditionOp = Callable[[float, float], bool]
+
+# (sensor, op_fn, value, priority, device, state, id, schedule_id)
+CompiledRule = Tuple[str, ConditionOp, float, int, str, int, Optional[int], Optional[int]]
+
+# Condition operators resolved once at index-build time
+_OPS: Dict[str, ConditionOp] = {
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': _approx_equal,
+}
+
+
 class RulesEngine:
     """Evaluates automation rules based on sensor conditions."""
     
@@ -18,8 +39,52 @@ class RulesEngine:
         """
         self.rules = rules
         self.scheduler = scheduler
+        # Incremented each time the rule index is rebuilt
+        self.version = 0
+        self._build_index()
         logger.info(f"Initialized rules engine with {len(rules)} rules")
     
+    def _build_index(self) -> None:
+        """Index enabled rules by (location, cluster).
+        
+        Condition fields are pre-extracted into CompiledRule tuples so
+        evaluation does not repeat dict lookups on every tick. Each list is
+        sorted by descending priority so the first match is the winner.
+        Rules with an unknown operator are logged once here and skipped.
+        """
+        self.version += 1
+        self._by_cluster: Dict[Tuple[str, str], List[CompiledRule]] = {}
+        # Clusters whose rules depend on time through a schedule constraint
+        self._scheduled_clusters: Set[Tuple[str, str]] = set()
+        
+        for rule in self.rules:
+            if not rule.get('enabled', True):
+                continue
+            
+            condition_operator = rule.get('condition_operator')
+            op_fn = _OPS.get(condition_operator)
+            if op_fn is None:
+                logger.warning(f"Unknown operator: {condition_operator} (rule {rule.get('id')})")
+                continue
+            
+            key = (rule.get('location'), rule.get('cluster'))
+            if rule.get('schedule_id') is not None:
+                self._scheduled_clusters.add(key)
+            self._by_cluster.setdefault(key, []).append((
+                rule.get('condition_sensor'),
+                op_fn,
+                rule.get('condition_value'),
+                rule.get('priority') or 0,
+                rule.get('action_device'),
+                rule.get('action_state'),
+                rule.get('id'),
+                rule.get('schedule_id')
+            ))
+        
+        # Highest priority first; stable sort keeps config order on ties
+        for cluster_rules in self._by_cluster.values():
+            cluster_rules.sort(key=lambda r: -r[3])
+    
     def evaluate(
         self,
         location: str,
@@ -42,101 +107,85 @@ class RulesEngine:
         if current_time is None:
             current_time = datetime.now()
         
-        matching_rules = []
+        # Schedule lookups are per action device; reuse them across rules in this call
+        schedule_cache: Dict[str, Tuple[bool, Optional[int]]] = {}
         
-        for rule in self.rules:
-            if not rule.get('enabled', True):
-                continue
+        for (condition_sensor, op_fn, condition_value, priority,
+             action_device, action_state, rule_id, schedule_id) in self._by_cluster.get((location, cluster), ()):
+            # Evaluate condition first; it is cheaper than the schedule lookup
+            sensor_value = sensor_values.get(condition_sensor)
+            if sensor_value is None:
+                continue  # Skip if sensor value is missing
             
-            if (rule.get('location') != location or
-                rule.get('cluster') != cluster):
+            if not op_fn(sensor_value, condition_value):
                 continue
             
             # Check if rule's schedule is active
-            schedule_id = rule.get('schedule_id')
             if schedule_id is not None:
                 # Rule is constrained by schedule - check if schedule is active
                 # Check if the specific schedule is active
                 # We need to find the schedule by ID and check if it's active
                 # For now, we'll check if any schedule for the action device is active
                 # This is a simplification - ideally we'd check the specific schedule_id
-                device_name = rule.get('action_device')
-                is_active, active_schedule_id = self.scheduler.is_schedule_active(
-                    location, cluster, device_name, current_time
-                )
+                schedule_state = schedule_cache.get(action_device)
+                if schedule_state is None:
+                    schedule_state = self.scheduler.is_schedule_active(
+                        location, cluster, action_device, current_time
+                    )
+                    schedule_cache[action_device] = schedule_state
+                is_active, active_schedule_id = schedule_state
                 if not is_active or active_schedule_id != schedule_id:
                     continue  # Rule's schedule not active, skip
             
-            # Evaluate condition
-            condition_sensor = rule.get('condition_sensor')
-            condition_operator = rule.get('condition_operator')
-            condition_value = rule.get('condition_value')
-            
-            if condition_sensor not in sensor_values:
-                continue
-            
-            sensor_value = sensor_values.get(condition_sensor)
-            if sensor_value is None:
-                continue  # Skip if sensor value is missing
-            
-            # Evaluate condition
-            condition_met = self._evaluate_condition(
-                sensor_value, condition_operator, condition_value
-            )
-            
-            if condition_met:
-                matching_rules.append({
-                    'rule': rule,
-                    'priority': rule.get('priority', 0),
-                    'device': rule.get('action_device'),
-                    'state': rule.get('action_state')
-                })
-        
-        # Return highest priority rule
-        if matching_rules:
-            # Sort by priority (higher priority first)
-            matching_rules.sort(key=lambda x: x['priority'], reverse=True)
-            best_rule = matching_rules[0]
-            return (
-                best_rule['device'],
-                best_rule['state'],
-                best_rule['rule'].get('id')
-            )
+            # Rules are sorted by priority, so the first match wins
+            return (action_device, action_state, rule_id)
         
         return None
     
-    def _evaluate_condition(
-        self, 
-        sensor_value: float, 
-        operator: str, 
-        threshold: float
-    ) -> bool:
-        """Evaluate a condition.
+    def evaluate_all(
+        self,
+        location: str,
+        cluster: str,
+        sensor_values: Dict[str, Optional[float]],
+        current_time: Optional[datetime] = None
+    ) -> Dict[str, Tuple[int, Optional[int]]]:
+        """Evaluate rules for a location/cluster once for all of its devices.
+        
+        Only the highest priority matching rule acts, as with evaluate(), so
+        the result holds at most one device.
+        
+        Args:
+            location: Location name
+            cluster: Cluster name
+            sensor_values: Dict mapping sensor names to values
+            current_time: Current time (default: now)
+        
+        Returns:
+            Dict mapping device_name to (action_state, rule_id)
+        """
+        rule_result = self.evaluate(location, cluster, sensor_values, current_time)
+        if rule_result is None:
+            return {}
+        device_name, action_state, rule_id = rule_result
+        return {device_name: (action_state, rule_id)}
+    
+    def has_scheduled_rules(self, location: str, cluster: str) -> bool:
+        """Check if any enabled rule for a location/cluster is constrained by a schedule.
+        
+        Without such rules, evaluate() depends only on sensor values.
         
         Args:
-            sensor_value: Current sensor value
-            operator: Comparison operator ('<', '>', '<=', '>=', '==')
-            threshold: Threshold value
+            location: Location name
+            cluster: Cluster name
         
         Returns:
-            True if condition is met, False otherwise
+            True if evaluation for the cluster also depends on the current time
         """
-        if operator == '<':
-            return sensor_value < threshold
-        elif operator == '>':
-            return sensor_value > threshold
-        elif operator == '<=':
-            return sensor_value <= threshold
-        elif operator == '>=':
-            return sensor_value >= threshold
-        elif operator == '==':
-            return abs(sensor_value - threshold) < 0.01  # Float comparison
-        else:
-            logger.warning(f"Unknown operator: {operator}")
-            return False
+        return (location, cluster) in self._scheduled_clusters
     
     def update_rules(self, rules: List[Dict[str, any]]):
         """Update rules list."""
         self.rules = rules
+        self._build_index()
         logger.info(f"Updated rules: {len(rules)} rules")
 
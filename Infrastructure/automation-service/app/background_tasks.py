@@ -1,10 +1,14 @@
 """Background tasks for automation control loop."""
 import asyncio
+import heapq
 import logging
-from typing import Optional
+import random
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional
 from app.control.control_engine import ControlEngine
 from app.database import DatabaseManager
 from app.alarm_manager import AlarmManager
+from app.redis_client import PID_CHANGED_CHANNEL
 
 logger = logging.getLogger(__name__)
 
@@ -32,8 +36,10 @@ class BackgroundTasks:
         self.alarm_manager = alarm_manager
         self.update_interval = update_interval
         self._running = False
+        self._retry_delay = 1.0
+        self._max_retry_delay = 60.0
+        self._heartbeat_interval = 2  # Write heartbeat every 2 seconds
         self._task: Optional[asyncio.Task] = None
-        self._heartbeat_task: Optional[asyncio.Task] = None
         self._auto_persist_task: Optional[asyncio.Task] = None
     
     async def start(self) -> None:
@@ -43,8 +49,7 @@ class BackgroundTasks:
             return
         
         self._running = True
-        self._task = asyncio.create_task(self._control_loop())
-        self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        self._task = asyncio.create_task(self._scheduler_loop())
         self._auto_persist_task = asyncio.create_task(self._auto_persist_loop())
         logger.info(f"Background control loop started (interval: {self.update_interval}s)")
         logger.info("Heartbeat and auto-persist tasks started")
@@ -54,7 +59,7 @@ class BackgroundTasks:
         self._running = False
         
         # Cancel all tasks
-        tasks = [self._task, self._heartbeat_task, self._auto_persist_task]
+        tasks = [self._task, self._auto_persist_task]
         for task in tasks:
             if task:
                 task.cancel()
@@ -65,42 +70,102 @@ class BackgroundTasks:
         
         logger.info("Background control loop and tasks stopped")
     
-    async def _control_loop(self) -> None:
-        """Main control loop."""
-        retry_delay = 1.0
-        max_retry_delay = 60.0
+    async def _scheduler_loop(self) -> None:
+        """Run the periodic tasks from a single timer heap.
         
-        while self._running:
-            try:
-                # Check database connection
-                if not self.database._db_connected:
-                    # Try to reconnect
-                    try:
-                        await self.database._connect_db()
-                        self.database._db_connected = True
-                        retry_delay = 1.0
-                        logger.info("Database connection restored")
-                    except Exception as e:
-                        logger.warning(f"Database connection failed: {e}. Retrying in {retry_delay}s...")
-                        await asyncio.sleep(retry_delay)
-                        retry_delay = min(retry_delay * 2, max_retry_delay)
-                        continue
-                
-                # Run control loop
-                await self.control_engine.run_control_loop()
-                
-                # Reset retry delay on success
-                retry_delay = 1.0
+        Each entry is (deadline, name, tick, interval). Due ticks run as their
+        own tasks, so a slow control iteration or database reconnect does not
+        hold up the heartbeat. An entry goes back on the heap only when its
+        tick finishes, using the delay the tick returns (the previous interval
+        if it raised), so a tick never overlaps itself.
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        wheel = [
+            (now, 'control', self._control_tick, float(self.update_interval)),
+            (now, 'heartbeat', self._heartbeat_tick, float(self._heartbeat_interval)),
+        ]
+        heapq.heapify(wheel)
+        wakeup = asyncio.Event()
+        running: Dict[str, asyncio.Task] = {}
+        
+        def reschedule(
+            name: str,
+            tick: Callable[[], Awaitable[float]],
+            interval: float,
+            task: asyncio.Task
+        ) -> None:
+            running.pop(name, None)
+            if task.cancelled():
+                return
+            error = task.exception()
+            if error is not None:
+                logger.error(f"Error in {name} task: {error}", exc_info=error)
+                # Continue running even on error
+            else:
+                interval = task.result()
+            heapq.heappush(wheel, (loop.time() + interval, name, tick, interval))
+            wakeup.set()
+        
+        try:
+            while self._running:
+                wakeup.clear()
+                if not wheel:
+                    await wakeup.wait()
+                    continue
                 
-                # Wait for next iteration
-                await asyncio.sleep(self.update_interval)
+                deadline, name, tick, interval = wheel[0]
+                delay = deadline - loop.time()
+                if delay > 0:
+                    # Sleep until the next deadline, or until a finished tick
+                    # pushes an earlier one
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 
-            except asyncio.CancelledError:
-                break
+                heapq.heappop(wheel)
+                task = asyncio.create_task(tick())
+                running[name] = task
+                task.add_done_callback(
+                    lambda task, name=name, tick=tick, interval=interval: reschedule(name, tick, interval, task)
+                )
+        except asyncio.CancelledError:
+            pass
+        finally:
+            tasks = list(running.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _control_tick(self) -> float:
+        """Run one control loop iteration.
+        
+        Returns:
+            Seconds until the next iteration
+        """
+        # Check database connection
+        if not self.database._db_connected:
+            # Try to reconnect
+            try:
+                await self.database._connect_db()
+                self.database._db_connected = True
+                logger.info("Database connection restored")
             except Exception as e:
-                logger.error(f"Error in control loop: {e}", exc_info=True)
-                # Continue running even on error
-                await asyncio.sleep(self.update_interval)
+                # Jitter the backoff so restarted services don't reconnect in lock-step
+                retry_delay = self._retry_delay * random.uniform(0.75, 1.25)
+                logger.warning(f"Database connection failed: {e}. Retrying in {retry_delay:.1f}s...")
+                self._retry_delay = min(self._retry_delay * 2, self._max_retry_delay)
+                return retry_delay
+        
+        # Run control loop
+        await self.control_engine.run_control_loop()
+        
+        # Reset retry delay on success
+        self._retry_delay = 1.0
+        
+        return self.update_interval
     
     def set_update_interval(self, interval: int) -> None:
         """Update control loop interval.
@@ -111,67 +176,122 @@ class BackgroundTasks:
         self.update_interval = interval
         logger.info(f"Control loop interval updated to {interval}s")
     
-    async def _heartbeat_loop(self) -> None:
-        """Heartbeat task - writes automation service heartbeat and checks sensor heartbeats."""
-        heartbeat_interval = 2  # Write heartbeat every 2 seconds
+    async def _heartbeat_tick(self) -> float:
+        """Write automation service heartbeat and check sensor heartbeats.
         
-        while self._running:
-            try:
-                # Write automation service heartbeat
-                if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-                    self.database._automation_redis.write_heartbeat('automation-service')
-                    
-                    # Check sensor heartbeats and update last good values
-                    # This would check for sensor:clusterA, sensor:clusterB, etc.
-                    # For now, we'll just write our own heartbeat
-                    # Sensor gateways should write their own heartbeats
-                
-                await asyncio.sleep(heartbeat_interval)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in heartbeat loop: {e}", exc_info=True)
-                await asyncio.sleep(heartbeat_interval)
+        Returns:
+            Seconds until the next heartbeat
+        """
+        # Write automation service heartbeat
+        if self.database._automation_redis and self.database._automation_redis.redis_enabled:
+            self.database._automation_redis.write_heartbeat('automation-service')
+            
+            # Check sensor heartbeats and update last good values
+            # This would check for sensor:clusterA, sensor:clusterB, etc.
+            # For now, we'll just write our own heartbeat
+            # Sensor gateways should write their own heartbeats
+        
+        return self._heartbeat_interval
     
     async def _auto_persist_loop(self) -> None:
-        """Auto-persist task - syncs Redis to database periodically."""
-        persist_interval = 60  # Sync every 60 seconds
+        """Auto-persist task - syncs Redis to database when parameters change.
         
-        while self._running:
-            try:
-                await asyncio.sleep(persist_interval)
-                
-                if not self.database._automation_redis or not self.database._automation_redis.redis_enabled:
-                    continue
-                
-                # Sync setpoints from Redis to DB (if changed)
-                # This is mainly for setpoints that were set via Node-RED override
-                # The database is already the source of truth for API-set setpoints
-                
-                # Sync PID parameters from Redis to DB (if changed)
-                # This ensures any changes made via API are persisted
-                device_types = ['heater', 'co2']
-                for device_type in device_types:
-                    redis_params = self.database._automation_redis.read_pid_parameters(device_type)
-                    if redis_params:
-                        # Check if different from DB
-                        db_params = await self.database.get_pid_parameters(device_type)
-                        if db_params:
-                            # Compare and update if different
-                            if (redis_params.get('kp') != db_params['kp'] or
-                                redis_params.get('ki') != db_params['ki'] or
-                                redis_params.get('kd') != db_params['kd']):
-                                await self.database.set_pid_parameters(
-                                    device_type,
-                                    redis_params['kp'],
-                                    redis_params['ki'],
-                                    redis_params['kd'],
-                                    source=redis_params.get('source', 'api')
-                                )
-                                logger.debug(f"Synced PID parameters for {device_type} from Redis to DB")
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in auto-persist loop: {e}", exc_info=True)
-
+        Wakes on PID change notifications and otherwise polls with exponential
+        backoff, so writes that bypass the notification (e.g. Node-RED writing
+        the key directly) are still persisted within max_interval.
+        """
+        min_interval = 5
+        max_interval = 60
+        persist_interval = min_interval
+        all_device_types = ['heater', 'co2']
+        pubsub = None
+        # Worker-thread wait on the pubsub; it must finish before the pubsub is closed
+        waiter: Optional[asyncio.Task] = None
+        stop_waiting = threading.Event()
+        
+        def keep_waiting() -> bool:
+            return self._running and not stop_waiting.is_set()
+        
+        try:
+            while self._running:
+                try:
+                    redis_client = self.database._automation_redis
+                    if not redis_client or not redis_client.redis_enabled:
+                        await asyncio.sleep(max_interval)
+                        continue
+                    
+                    if pubsub is None:
+                        pubsub = redis_client.subscribe(PID_CHANGED_CHANNEL)
+                    
+                    if pubsub is not None:
+                        # Shielded so cancelling this loop leaves the thread to
+                        # return (within one poll slice) before cleanup closes the pubsub
+                        waiter = asyncio.ensure_future(asyncio.to_thread(
+                            redis_client.wait_for_messages, pubsub, persist_interval, keep_waiting
+                        ))
+                        changed = await asyncio.shield(waiter)
+                        waiter = None
+                    else:
+                        await asyncio.sleep(persist_interval)
+                        changed = []
+                    
+                    if changed:
+                        # Notified: sync only the affected device types and stay responsive
+                        persist_interval = min_interval
+                        device_types = [dt for dt in dict.fromkeys(changed) if dt in all_device_types]
+                    else:
+                        # Idle: back off and fall back to a full poll
+                        persist_interval = min(persist_interval * 2, max_interval)
+                        device_types = all_device_types
+                    
+                    # Sync setpoints from Redis to DB (if changed)
+                    # This is mainly for setpoints that were set via Node-RED override
+                    # The database is already the source of truth for API-set setpoints
+                    
+                    await self._sync_pid_parameters(device_types)
+                    
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    logger.error(f"Error in auto-persist loop: {e}", exc_info=True)
+                    if pubsub is not None:
+                        pubsub.close()
+                        pubsub = None
+                    await asyncio.sleep(persist_interval)
+        finally:
+            stop_waiting.set()
+            if waiter is not None:
+                await asyncio.wait([waiter])
+            if pubsub is not None:
+                pubsub.close()
+    
+    async def _sync_pid_parameters(self, device_types: List[str]) -> None:
+        """Sync PID parameters from Redis to DB (if changed).
+        
+        This ensures any changes made via API are persisted.
+        
+        Args:
+            device_types: Device types to sync
+        """
+        redis_params_by_type = self.database._automation_redis.read_pid_parameters_bulk(device_types)
+        if not redis_params_by_type:
+            return
+        
+        # Compare against DB in one query and write all changes in one transaction
+        db_params_by_type = await self.database.get_pid_parameters_bulk(list(redis_params_by_type))
+        updates = []
+        for device_type, redis_params in redis_params_by_type.items():
+            db_params = db_params_by_type.get(device_type)
+            if db_params and (redis_params.get('kp') != db_params['kp'] or
+                              redis_params.get('ki') != db_params['ki'] or
+                              redis_params.get('kd') != db_params['kd']):
+                updates.append((
+                    device_type,
+                    redis_params['kp'],
+                    redis_params['ki'],
+                    redis_params['kd'],
+                    redis_params.get('source', 'api')
+                ))
+        
+        if updates and await self.database.set_pid_parameters_bulk(updates):
+            logger.debug(f"Synced PID parameters for {', '.join(u[0] for u in updates)} from Redis to DB")
@@ -1,15 +1,59 @@
 """Configuration loader for YAML config files."""
+import os
+import sys
 import yaml
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    # libyaml-backed loader, several times faster than the pure-Python one
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Shared read-only defaults for missing config sections
+_EMPTY_DICT: Mapping[str, Any] = MappingProxyType({})
+_EMPTY_LIST: Sequence[Any] = ()
+
+
+def _intern_keys(data: Any) -> Any:
+    """Return parsed YAML data with all string mapping keys interned.
+    
+    Literal keys in the code are interned by the compiler, so interned
+    YAML keys let dict lookups match on identity.
+    """
+    if isinstance(data, dict):
+        return {
+            (sys.intern(k) if isinstance(k, str) else k): _intern_keys(v)
+            for k, v in data.items()
+        }
+    if isinstance(data, list):
+        return [_intern_keys(item) for item in data]
+    return data
+
 
 class ConfigLoader:
     """Loads and parses YAML configuration files."""
     
+    __slots__ = (
+        'config_path', 'schedules_path', 'rules_path',
+        '_config_path_str', '_schedules_path_str', '_rules_path_str',
+        '_config', '_schedules', '_rules', '_schedules_loaded', '_rules_loaded',
+        '_hardware', '_devices', '_control', '_pid', '_safety', '_defaults',
+        '_sensors', '_interlocks', '_update_interval', '_device_index',
+        '_pid_params_cache', '_dot_cache', '_key_parts_cache', 'version',
+    )
+    
+    # Parsed YAML keyed by absolute path: (st_mtime_ns, st_size, parsed data).
+    # Shared across instances; parsed objects are treated as read-only.
+    _PARSE_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+    
     def __init__(self, config_path: Optional[str] = None):
         """Initialize config loader.
         
@@ -23,109 +67,202 @@ class ConfigLoader:
                 Path("/home/antoine/Project CEA/Infrastructure/automation-service/automation_config.yaml"),
             ]
             for path in possible_paths:
-                if path.exists():
-                    config_path = str(path)
-                    break
-        
-        if config_path is None or not Path(config_path).exists():
+                try:
+                    os.stat(path)
+                except FileNotFoundError:
+                    continue
+                config_path = str(path)
+                break
+            if config_path is None:
+                raise FileNotFoundError(f"Config file not found: {config_path}")
+        elif not os.path.exists(config_path):
             raise FileNotFoundError(f"Config file not found: {config_path}")
         
         self.config_path = Path(config_path)
         self.schedules_path = self.config_path.parent / "schedules.yaml"
         self.rules_path = self.config_path.parent / "rules.yaml"
+        # Absolute path strings used for file access and as parse cache keys
+        self._config_path_str = os.path.abspath(self.config_path)
+        config_dir = os.path.dirname(self._config_path_str)
+        self._schedules_path_str = os.path.join(config_dir, "schedules.yaml")
+        self._rules_path_str = os.path.join(config_dir, "rules.yaml")
         self._config: Dict[str, Any] = {}
         self._schedules: List[Dict[str, Any]] = []
         self._rules: List[Dict[str, Any]] = []
+        self._schedules_loaded = False
+        self._rules_loaded = False
+        self._hardware: Dict[str, Any] = {}
+        self._devices: Dict[str, Any] = {}
+        self._control: Dict[str, Any] = {}
+        self._pid: Dict[str, Any] = {}
+        self._safety: Dict[str, float] = {}
+        self._defaults: Dict[str, Any] = {}
+        self._sensors: Dict[str, Any] = {}
+        self._interlocks: List[Dict[str, Any]] = []
+        self._update_interval: int = 1
+        self._device_index: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._pid_params_cache: Dict[str, Dict[str, float]] = {}
+        self._dot_cache: Dict[str, Any] = {}
+        self._key_parts_cache: Dict[str, Tuple[str, ...]] = {}
+        # Incremented on every load so callers can invalidate derived caches
+        self.version = 0
         self.load()
     
     def load(self) -> None:
         """Load configuration from YAML files."""
+        self._dot_cache.clear()
+        self._pid_params_cache.clear()
+        
         # Load main config
-        with open(self.config_path, 'r') as f:
-            self._config = yaml.safe_load(f) or {}
-        
-        # Load schedules if exists
-        if self.schedules_path.exists():
-            with open(self.schedules_path, 'r') as f:
-                schedules_data = yaml.safe_load(f) or {}
-                self._schedules = schedules_data.get('schedules', [])
-        else:
-            # Check if schedules are in main config
-            if 'schedules' in self._config:
-                self._schedules = self._config['schedules']
-        
-        # Load rules if exists
-        if self.rules_path.exists():
-            with open(self.rules_path, 'r') as f:
-                rules_data = yaml.safe_load(f) or {}
-                self._rules = rules_data.get('rules', [])
-        else:
-            # Check if rules are in main config
-            if 'rules' in self._config:
-                self._rules = self._config['rules']
+        self._config = self._load_yaml(self._config_path_str) or _EMPTY_DICT
+        
+        # Schedules and rules are parsed on first access
+        self._schedules_loaded = False
+        self._rules_loaded = False
+        
+        # Precompute sections served by the get_* accessors
+        self._hardware = self._config.get('hardware', _EMPTY_DICT)
+        self._devices = self._config.get('devices', _EMPTY_DICT)
+        self._control = self._config.get('control', _EMPTY_DICT)
+        self._pid = self._control.get('pid', _EMPTY_DICT)
+        self._safety = self._control.get('safety_limits', _EMPTY_DICT)
+        self._defaults = self._control.get('default_setpoints', _EMPTY_DICT)
+        self._sensors = self._config.get('sensors', _EMPTY_DICT)
+        self._interlocks = self._config.get('interlocks', _EMPTY_LIST)
+        self._update_interval = self._control.get('update_interval', 1)
+        self._device_index = {
+            (location, cluster, device_name): device_info
+            for location, clusters in self._devices.items()
+            for cluster, cluster_devices in clusters.items()
+            for device_name, device_info in cluster_devices.items()
+        }
         
+        self.version += 1
         logger.info(f"Loaded config from {self.config_path}")
-        if self._schedules:
-            logger.info(f"Loaded {len(self._schedules)} schedules")
-        if self._rules:
-            logger.info(f"Loaded {len(self._rules)} rules")
+    
+    def _load_yaml(self, path: str) -> Any:
+        """Parse a YAML file, reusing the cached result if the file is unchanged.
+        
+        The file is stat'ed once; that stat both detects a missing file and
+        validates the cache entry.
+        
+        Args:
+            path: Absolute path to the YAML file (also the cache key)
+        
+        Returns:
+            Parsed YAML data (None for an empty file)
+        
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        st = os.stat(path)
+        cached = self._PARSE_CACHE.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        with open(path, 'rb') as f:
+            data = _intern_keys(yaml.load(f.read(), Loader=_Loader))
+        self._PARSE_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
+        return data
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get configuration value using dot notation (e.g., 'hardware.i2c_bus')."""
-        keys = key.split('.')
+        cached = self._dot_cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        keys = self._key_parts_cache.get(key)
+        if keys is None:
+            keys = self._key_parts_cache[key] = tuple(key.split('.'))
         value = self._config
         for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-                if value is None:
-                    return default
-            else:
+            try:
+                value = value.get(k, _MISSING)
+            except AttributeError:
+                # Walked into a non-mapping value
                 return default
+            if value is _MISSING:
+                return default
+        # Only found values are cached so a miss always returns the caller's default
+        self._dot_cache[key] = value
         return value
     
     def get_hardware_config(self) -> Dict[str, Any]:
         """Get hardware configuration."""
-        return self._config.get('hardware', {})
+        return self._hardware
     
     def get_devices(self) -> Dict[str, Any]:
         """Get device configuration."""
-        return self._config.get('devices', {})
+        return self._devices
+    
+    def get_device_info(self, location: str, cluster: str, device_name: str) -> Optional[Dict[str, Any]]:
+        """Get configuration for a single device.
+        
+        Args:
+            location: Location name
+            cluster: Cluster name
+            device_name: Device name
+        
+        Returns:
+            Device configuration dict or None if not configured
+        """
+        return self._device_index.get((location, cluster, device_name))
     
     def get_control_config(self) -> Dict[str, Any]:
         """Get control configuration."""
-        return self._config.get('control', {})
+        return self._control
     
     def get_pid_config(self) -> Dict[str, Any]:
         """Get PID configuration."""
-        return self._config.get('control', {}).get('pid', {})
+        return self._pid
     
     def get_safety_limits(self) -> Dict[str, float]:
         """Get safety limits."""
-        return self._config.get('control', {}).get('safety_limits', {})
+        return self._safety
     
     def get_default_setpoints(self) -> Dict[str, Any]:
         """Get default setpoints."""
-        return self._config.get('control', {}).get('default_setpoints', {})
+        return self._defaults
     
     def get_sensor_mapping(self) -> Dict[str, Any]:
         """Get sensor mapping."""
-        return self._config.get('sensors', {})
+        return self._sensors
     
     def get_update_interval(self) -> int:
         """Get control loop update interval in seconds."""
-        return self._config.get('control', {}).get('update_interval', 1)
+        return self._update_interval
     
     def get_schedules(self) -> List[Dict[str, Any]]:
-        """Get schedules."""
+        """Get schedules (parsed on first call after each load)."""
+        if not self._schedules_loaded:
+            try:
+                schedules_data = self._load_yaml(self._schedules_path_str) or _EMPTY_DICT
+                self._schedules = schedules_data.get('schedules', _EMPTY_LIST)
+            except FileNotFoundError:
+                # Check if schedules are in main config
+                self._schedules = self._config.get('schedules', _EMPTY_LIST)
+            self._schedules_loaded = True
+            if self._schedules:
+                logger.info(f"Loaded {len(self._schedules)} schedules")
         return self._schedules
     
     def get_rules(self) -> List[Dict[str, Any]]:
-        """Get rules."""
+        """Get rules (parsed on first call after each load)."""
+        if not self._rules_loaded:
+            try:
+                rules_data = self._load_yaml(self._rules_path_str) or _EMPTY_DICT
+                self._rules = rules_data.get('rules', _EMPTY_LIST)
+            except FileNotFoundError:
+                # Check if rules are in main config
+                self._rules = self._config.get('rules', _EMPTY_LIST)
+            self._rules_loaded = True
+            if self._rules:
+                logger.info(f"Loaded {len(self._rules)} rules")
         return self._rules
     
     def get_interlocks(self) -> List[Dict[str, Any]]:
         """Get interlock rules."""
-        return self._config.get('interlocks', [])
+        return self._interlocks
     
     def get_pid_params_for_device(self, device_type: str) -> Dict[str, float]:
         """Get PID parameters for a device type.
@@ -134,24 +271,24 @@ class ConfigLoader:
             device_type: Device type (e.g., 'heater', 'co2')
         
         Returns:
-            Dict with 'kp', 'ki', 'kd' values
+            Dict with 'kp', 'ki', 'kd' values (shared; do not modify)
         """
-        pid_config = self.get_pid_config()
+        cached = self._pid_params_cache.get(device_type)
+        if cached is not None:
+            return cached
         
-        # Try device-specific params first
-        kp_key = f"{device_type}_kp"
-        ki_key = f"{device_type}_ki"
-        kd_key = f"{device_type}_kd"
+        pid_config = self._pid
         
-        kp = pid_config.get(kp_key, pid_config.get('default_kp', 10.0))
-        ki = pid_config.get(ki_key, pid_config.get('default_ki', 0.01))
-        kd = pid_config.get(kd_key, pid_config.get('default_kd', 0.0))
+        # Try device-specific params first
+        kp = pid_config.get(device_type + '_kp', pid_config.get('default_kp', 10.0))
+        ki = pid_config.get(device_type + '_ki', pid_config.get('default_ki', 0.01))
+        kd = pid_config.get(device_type + '_kd', pid_config.get('default_kd', 0.0))
         
-        return {'kp': kp, 'ki': ki, 'kd': kd}
+        params = self._pid_params_cache[device_type] = {'kp': kp, 'ki': ki, 'kd': kd}
+        return params
     
     def reload(self) -> None:
         """Reload configuration from files (incremental reload)."""
-        old_config = self._config.copy()
         self.load()
         logger.info("Configuration reloaded")
         # Note: Incremental reload - changes applied as loaded, not atomic
@@ -1,5 +1,8 @@
 """Control engine that orchestrates rules, schedules, and PID control."""
+import asyncio
 import logging
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
 from app.control.relay_manager import RelayManager
@@ -12,6 +15,101 @@ from app.alarm_manager import AlarmManager
 
 logger = logging.getLogger(__name__)
 
+_NO_CONTROL_SENSORS: Tuple[Optional[str], Optional[str], Optional[str]] = (None, None, None)
+
+# Dehumidifying device types driven by VPD control
+_VPD_DEVICE_TYPES = frozenset({'fan', 'dehumidifier'})
+
+# A last good value within this of the one last written is only rewritten
+# (to refresh its timestamp) once the refresh interval has passed: at most
+# this many seconds, and at most a quarter of the last good hold period
+_LAST_GOOD_EPSILON = 0.01
+_LAST_GOOD_MAX_REFRESH_SECONDS = 5.0
+
+
+@dataclass(slots=True)
+class AutomationContext:
+    """Per-device automation context reported in the automation state log."""
+    active_rule_ids: List[int] = field(default_factory=list)
+    active_schedule_ids: List[int] = field(default_factory=list)
+    pid_output: Optional[float] = None
+    duty_cycle_percent: Optional[float] = None
+    # 'unknown' until the device is first processed
+    control_reason: Optional[str] = 'unknown'
+    schedule_ramp_up_duration: Optional[int] = None
+    schedule_ramp_down_duration: Optional[int] = None
+    schedule_photoperiod_hours: Optional[float] = None
+    pid_kp: Optional[float] = None
+    pid_ki: Optional[float] = None
+    pid_kd: Optional[float] = None
+
+
+@dataclass(slots=True)
+class DeviceEntry:
+    """Configured device with its lookups resolved once per config version.
+    
+    The control plan flags classify the device up front so the per-tick
+    path does not re-read and compare config fields.
+    """
+    key: Tuple[str, str, str]
+    # (location, cluster), built once for the per-tick table lookups
+    cluster_key: Tuple[str, str]
+    device_info: Dict[str, Any]
+    # (temperature_sensor, co2_sensor, vpd_sensor) for the device's cluster
+    control_sensors: Tuple[Optional[str], Optional[str], Optional[str]]
+    context: AutomationContext
+    device_type: str
+    pwm_period: int
+    # DFR0971-dimmed light with board and channel configured
+    dimmable: bool
+    board_id: Optional[int]
+    channel: Optional[int]
+    pid_enabled: bool
+    # Dehumidifying device driven by VPD
+    vpd_control: bool
+    # Only rules/manual mode can act on it (no PID, VPD or dimming)
+    passive: bool
+    # Last automation state row written for the device and when
+    logged_state: Optional[Tuple[Any, ...]] = None
+    logged_at: Optional[datetime] = None
+    # (mode, relay state) after the last tick that left a passive device with
+    # nothing left to do, or None
+    settled: Optional[Tuple[Optional[str], int]] = None
+    
+    @classmethod
+    def from_config(
+        cls,
+        key: Tuple[str, str, str],
+        device_info: Dict[str, Any],
+        control_sensors: Tuple[Optional[str], Optional[str], Optional[str]],
+        context: AutomationContext
+    ) -> 'DeviceEntry':
+        """Build an entry and its control plan from device configuration."""
+        device_type = device_info.get('device_type', '')
+        board_id = device_info.get('dimming_board_id')
+        channel = device_info.get('dimming_channel')
+        dimmable = bool(
+            device_info.get('dimming_enabled') and device_info.get('dimming_type') == 'dfr0971'
+            and board_id is not None and channel is not None
+        )
+        pid_enabled = bool(device_info.get('pid_enabled', False))
+        vpd_control = device_type in _VPD_DEVICE_TYPES
+        return cls(
+            key=key,
+            cluster_key=key[:2],
+            device_info=device_info,
+            control_sensors=control_sensors,
+            context=context,
+            device_type=device_type,
+            pwm_period=device_info.get('pwm_period', 100),  # Default 100 seconds
+            dimmable=dimmable,
+            board_id=board_id,
+            channel=channel,
+            pid_enabled=pid_enabled,
+            vpd_control=vpd_control,
+            passive=not (pid_enabled or vpd_control or dimmable)
+        )
+
 
 class ControlEngine:
     """Main control engine that executes automation logic."""
@@ -48,8 +146,55 @@ class ControlEngine:
         # PID controllers per device
         self._pid_controllers: Dict[Tuple[str, str, str], PIDController] = {}
         
-        # Track automation context for logging
-        self._automation_context: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        # Control actions queued during a tick, flushed in one batch at the end
+        self._pending_control_actions: List[Tuple[Any, ...]] = []
+        # Device state writes queued during a tick, flushed before the control actions
+        self._pending_device_states: List[Tuple[str, str, str, int, int, str]] = []
+        
+        # Last good sensor values queued during a tick, keyed by (cluster, sensor_name)
+        # so devices sharing a sensor write it once
+        self._pending_last_good: Dict[Tuple[str, str], float] = {}
+        # (value, monotonic time) of the last successful last good write per sensor
+        self._last_good_written: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        # Alarms raised during a tick, keyed by (location, cluster, alarm_name) so
+        # devices sharing a sensor raise it once; value is (severity, message)
+        self._pending_alarms: Dict[Tuple[str, str, str], Tuple[str, str]] = {}
+        # Schedule light intensities queued during a tick, written in one Redis pipeline
+        self._pending_light_intensities: List[Tuple[str, str, str, float, float, int, int]] = []
+        
+        # Sensor lookups resolved from config, rebuilt when config.version changes
+        self._config_version: Optional[int] = None
+        self._cluster_sensor_names: Dict[Tuple[str, str], List[str]] = {}
+        # Every sensor read by a cluster with devices, fetched together each tick
+        self._all_sensor_names: List[str] = []
+        self._last_good_hold_period = config.get('control.last_good_hold_period', 30)
+        self._state_heartbeat = config.get('control.automation_state_heartbeat', 60)
+        # (temperature_sensor, co2_sensor, vpd_sensor) per location/cluster
+        self._control_sensors: Dict[Tuple[str, str], Tuple[Optional[str], Optional[str], Optional[str]]] = {}
+        # Flat device list, plus the same entries grouped by location/cluster
+        self._device_entries: List[DeviceEntry] = []
+        self._cluster_entries: Dict[Tuple[str, str], List[DeviceEntry]] = {}
+        # Locations/clusters with PID or VPD devices, whose setpoints are prefetched
+        self._setpoint_clusters: List[Tuple[str, str]] = []
+        
+        # Seconds since the previous tick (monotonic), used as the PID time step
+        self._tick_dt = float(config.get_update_interval())
+        self._last_tick_monotonic: Optional[float] = None
+        
+        # Per-tick Redis state (mode, failsafe, last good values) per location/cluster
+        self._tick_cache: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        # Per-tick default (mode=NULL) setpoints per location/cluster
+        self._setpoints: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        # Per-tick values of every sensor in _all_sensor_names
+        self._tick_sensor_values: Dict[str, Optional[float]] = {}
+        # First available sensor value per location/cluster, logged with control actions
+        self._first_sensor_value: Dict[Tuple[str, str], Optional[float]] = {}
+        # Previous tick's sensor values per location/cluster, to detect idle clusters
+        self._last_sensor_values: Dict[Tuple[str, str], Dict[str, Optional[float]]] = {}
+        # Rule evaluation result per location/cluster, reused while the cluster is
+        # clean and the rules are unchanged
+        self._rule_hits: Dict[Tuple[str, str], Dict[str, Tuple[int, Optional[int]]]] = {}
+        self._rules_version: Optional[int] = None
         
         logger.info("Control engine initialized")
     
@@ -57,279 +202,508 @@ class ControlEngine:
         """Run one iteration of the control loop."""
         current_time = datetime.now()
         
-        # Get all devices from config
-        devices = self.config.get_devices()
+        # Measure the real loop period so PID integration stays correct under
+        # jitter; the first tick uses the configured interval
+        now_monotonic = time.monotonic()
+        if self._last_tick_monotonic is None:
+            self._tick_dt = float(self.config.get_update_interval())
+        else:
+            self._tick_dt = now_monotonic - self._last_tick_monotonic
+        self._last_tick_monotonic = now_monotonic
         
-        # Get sensor values for all locations/clusters
-        sensor_mapping = self.config.get_sensor_mapping()
+        self._refresh_config_snapshot()
         
         # Process each location/cluster
-        for location, clusters in devices.items():
+        try:
+            await self._process_clusters(current_time)
+        finally:
+            # Log control actions even if a device failed mid-tick
+            await self._flush_control_actions()
+            self._flush_alarms()
+            self._flush_last_good_values()
+            self._flush_light_intensities()
+        
+        # Log automation state for devices that changed
+        await self._log_automation_state(current_time)
+    
+    def _refresh_config_snapshot(self) -> None:
+        """Re-resolve per-cluster sensor names and the device index if the config was reloaded."""
+        if self._config_version == self.config.version:
+            return
+        self._config_version = self.config.version
+        self._last_good_hold_period = self.config.get('control.last_good_hold_period', 30)
+        self._state_heartbeat = self.config.get('control.automation_state_heartbeat', 60)
+        
+        self._cluster_sensor_names = {}
+        self._control_sensors = {}
+        for location, location_sensors in self.config.get_sensor_mapping().items():
+            for cluster, cluster_sensors in location_sensors.items():
+                self._cluster_sensor_names[(location, cluster)] = [
+                    sensor_name for sensor_name in cluster_sensors.values() if sensor_name
+                ]
+                self._control_sensors[(location, cluster)] = (
+                    cluster_sensors.get('temperature_sensor'),
+                    cluster_sensors.get('co2_sensor'),
+                    cluster_sensors.get('vpd_sensor')
+                )
+        
+        # Keep existing contexts across reloads
+        contexts = {entry.key: entry.context for entry in self._device_entries}
+        self._device_entries = []
+        self._cluster_entries = {}
+        for location, clusters in self.config.get_devices().items():
             for cluster, cluster_devices in clusters.items():
-                # Get sensor values for this location/cluster
-                sensor_values = await self._get_sensor_values(location, cluster, sensor_mapping)
-                
-                # Process each device
+                control_sensors = self._control_sensors.get((location, cluster), _NO_CONTROL_SENSORS)
+                entries = self._cluster_entries[(location, cluster)] = []
                 for device_name, device_info in cluster_devices.items():
-                    await self._process_device(
-                        location, cluster, device_name, device_info,
-                        sensor_values, current_time
-                    )
+                    key = (location, cluster, device_name)
+                    context = contexts.get(key) or AutomationContext()
+                    entry = DeviceEntry.from_config(key, device_info, control_sensors, context)
+                    entries.append(entry)
+                    self._device_entries.append(entry)
+        
+        # Drop PID controllers of devices that were removed or no longer use PID
+        pid_keys = {entry.key for entry in self._device_entries if entry.pid_enabled}
+        for key in [key for key in self._pid_controllers if key not in pid_keys]:
+            del self._pid_controllers[key]
+        
+        self._setpoint_clusters = [
+            cluster_key for cluster_key, entries in self._cluster_entries.items()
+            if any(entry.pid_enabled or entry.vpd_control for entry in entries)
+        ]
+        self._all_sensor_names = list(dict.fromkeys(
+            sensor_name
+            for cluster_key in self._cluster_entries
+            for sensor_name in self._cluster_sensor_names.get(cluster_key, ())
+        ))
+    
+    async def _process_clusters(self, current_time: datetime) -> None:
+        """Run control for every location/cluster.
         
-        # Log automation state for all devices
-        await self._log_automation_state()
+        Args:
+            current_time: Current time
+        """
+        self._tick_cache = {}
+        self._first_sensor_value = {}
+        # Sensor values and setpoints for every cluster, each in one batch
+        self._tick_sensor_values = await self.database.get_sensor_values(self._all_sensor_names)
+        self._setpoints = await self.database.get_setpoints_bulk(self._setpoint_clusters)
+        if self._rules_version != self.rules_engine.version:
+            # Rules changed: treat every cluster as dirty this tick
+            self._rules_version = self.rules_engine.version
+            self._rule_hits = {}
+            self._last_sensor_values = {}
+        
+        # Clusters are independent and only touch per-cluster keys in the
+        # shared per-tick tables, so their sensor reads and device I/O overlap
+        results = await asyncio.gather(*(
+            self._process_cluster(location, cluster, entries, current_time)
+            for (location, cluster), entries in self._cluster_entries.items()
+        ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
     
-    async def _get_sensor_values(
+    async def _process_cluster(
         self,
         location: str,
         cluster: str,
-        sensor_mapping: Dict[str, Any]
-    ) -> Dict[str, Optional[float]]:
-        """Get sensor values for a location/cluster.
+        entries: List[DeviceEntry],
+        current_time: datetime
+    ) -> None:
+        """Run control for one location/cluster.
         
         Args:
             location: Location name
             cluster: Cluster name
-            sensor_mapping: Sensor mapping from config
-        
-        Returns:
-            Dict mapping sensor names to values
+            entries: Devices in the cluster
+            current_time: Current time
         """
-        sensor_values = {}
+        cluster_key = (location, cluster)
         
-        location_sensors = sensor_mapping.get(location, {})
-        cluster_sensors = location_sensors.get(cluster, {})
+        # Get sensor values for this location/cluster
+        sensor_values = self._get_sensor_values(location, cluster)
+        self._first_sensor_value[cluster_key] = next(
+            (value for value in sensor_values.values() if value is not None), None
+        )
+        self._prefetch_cluster_state(location, cluster, entries, sensor_values)
+        
+        # With the same sensor values and no time-dependent rules, rule
+        # evaluation gives the same result as last tick
+        cluster_clean = (
+            sensor_values == self._last_sensor_values.get(cluster_key)
+            and not self.rules_engine.has_scheduled_rules(location, cluster)
+        )
+        self._last_sensor_values[cluster_key] = sensor_values
+        
+        # Rules pick one winning action for the whole cluster
+        rule_hits = self._rule_hits.get(cluster_key)
+        if not cluster_clean or rule_hits is None:
+            rule_hits = self._rule_hits[cluster_key] = self.rules_engine.evaluate_all(
+                location, cluster, sensor_values, current_time
+            )
         
-        for sensor_type, sensor_name in cluster_sensors.items():
-            if sensor_name:
-                value = await self.database.get_sensor_value(sensor_name)
-                sensor_values[sensor_name] = value
+        # Active schedules for the whole cluster in one pass
+        schedule_states = self.scheduler.get_schedule_states_bulk(location, cluster, current_time)
         
-        return sensor_values
+        # Process devices concurrently so one device's DB/Redis waits
+        # don't hold up the rest of the cluster. Each device only
+        # touches its own context/PID controller, and relay updates
+        # are synchronous, so no locking is needed.
+        results = await asyncio.gather(*(
+            self._process_device(
+                entry, sensor_values, current_time, rule_hits, schedule_states, cluster_clean
+            )
+            for entry in entries
+        ), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
     
-    async def _process_device(
+    def _prefetch_cluster_state(
         self,
         location: str,
         cluster: str,
-        device_name: str,
-        device_info: Dict[str, Any],
-        sensor_values: Dict[str, Optional[float]],
-        current_time: datetime
+        entries: List[DeviceEntry],
+        sensor_values: Dict[str, Optional[float]]
     ) -> None:
-        """Process control for a single device.
+        """Read the cluster's Redis control state in one round trip for this tick.
+        
+        Last good values are only fetched for control sensors that have no
+        current reading, since those are the only ones the PID/VPD paths read.
         
         Args:
             location: Location name
             cluster: Cluster name
-            device_name: Device name
-            device_info: Device configuration
+            entries: Devices in the cluster
+            sensor_values: Current sensor values for the cluster
+        """
+        redis_client = self.database._automation_redis
+        if not (redis_client and redis_client.redis_enabled):
+            self._tick_cache[(location, cluster)] = None
+            return
+        
+        missing_sensors = list(dict.fromkeys(
+            sensor_name
+            for entry in entries
+            for sensor_name in entry.control_sensors
+            if sensor_name and sensor_values.get(sensor_name) is None
+        ))
+        self._tick_cache[(location, cluster)] = redis_client.read_cluster_state(
+            location, cluster, missing_sensors
+        )
+    
+    async def _flush_control_actions(self) -> None:
+        """Write device states and control actions queued by _set_device_state, one batch each."""
+        if self._pending_device_states:
+            states = self._pending_device_states
+            self._pending_device_states = []
+            await self.database.set_device_states_bulk(states)
+        if not self._pending_control_actions:
+            return
+        actions = self._pending_control_actions
+        self._pending_control_actions = []
+        await self.database.log_control_actions_bulk(actions)
+    
+    def _flush_last_good_values(self) -> None:
+        """Write last good sensor values queued during the tick in one Redis pipeline.
+        
+        Values that have not moved since their last write are skipped until
+        min(_LAST_GOOD_MAX_REFRESH_SECONDS, hold period / 4) has passed, so the
+        stored timestamp is never more than a quarter of the hold period old.
+        """
+        if not self._pending_last_good:
+            return
+        now = self._last_tick_monotonic
+        refresh = min(_LAST_GOOD_MAX_REFRESH_SECONDS, self._last_good_hold_period / 4)
+        written = self._last_good_written
+        values = []
+        for key, value in self._pending_last_good.items():
+            last = written.get(key)
+            if (
+                last is not None
+                and abs(value - last[0]) < _LAST_GOOD_EPSILON
+                and now - last[1] < refresh
+            ):
+                continue
+            values.append((key[0], key[1], value))
+        self._pending_last_good = {}
+        if values and self.database._automation_redis.write_last_good_values(values):
+            for cluster, sensor_name, value in values:
+                written[(cluster, sensor_name)] = (value, now)
+    
+    def _queue_critical_alarm(self, entry: DeviceEntry, alarm_name: str, message: str) -> None:
+        """Queue a critical alarm and put the device's cluster in failsafe for the rest of the tick.
+        
+        The alarm (and the failsafe it triggers) is written at the end of the
+        tick, but the cluster's remaining devices see failsafe in the tick
+        cache right away and skip PID/VPD control, as they would after
+        reading the failsafe back from Redis.
+        
+        Args:
+            entry: Device whose control raised the alarm
+            alarm_name: Alarm identifier
+            message: Alarm message
+        """
+        location, cluster, _ = entry.key
+        self._pending_alarms[(location, cluster, alarm_name)] = ('critical', message)
+        cluster_state = self._tick_cache.get(entry.cluster_key)
+        if cluster_state is not None:
+            cluster_state['failsafe'] = True
+    
+    def _flush_alarms(self) -> None:
+        """Raise alarms queued during the tick in one batch.
+        
+        AlarmManager.raise_alarms writes them with one Redis pipeline and
+        triggers failsafe once per location/cluster with a critical alarm.
+        """
+        if not self._pending_alarms:
+            return
+        alarms = [
+            (location, cluster, alarm_name, severity, message)
+            for (location, cluster, alarm_name), (severity, message) in self._pending_alarms.items()
+        ]
+        self._pending_alarms = {}
+        self.alarm_manager.raise_alarms(alarms)
+    
+    def _flush_light_intensities(self) -> None:
+        """Write light intensities queued during the tick in one Redis pipeline."""
+        if not self._pending_light_intensities:
+            return
+        lights = self._pending_light_intensities
+        self._pending_light_intensities = []
+        self.database._automation_redis.write_light_intensities(lights)
+    
+    def _get_sensor_values(
+        self,
+        location: str,
+        cluster: str
+    ) -> Dict[str, Optional[float]]:
+        """Get sensor values for a location/cluster from this tick's prefetch.
+        
+        Args:
+            location: Location name
+            cluster: Cluster name
+        
+        Returns:
+            Dict mapping sensor names to values
+        """
+        tick_values = self._tick_sensor_values
+        return {
+            sensor_name: tick_values.get(sensor_name)
+            for sensor_name in self._cluster_sensor_names.get((location, cluster), ())
+        }
+    
+    async def _process_device(
+        self,
+        entry: DeviceEntry,
+        sensor_values: Dict[str, Optional[float]],
+        current_time: datetime,
+        rule_hits: Dict[str, Tuple[int, Optional[int]]],
+        schedule_states: Dict[str, Tuple[int, Optional[int], Dict[str, Any]]],
+        cluster_clean: bool = False
+    ) -> None:
+        """Process control for a single device.
+        
+        Args:
+            entry: Indexed device (key, configuration, automation context)
             sensor_values: Available sensor values
             current_time: Current time
+            rule_hits: Cluster rule result (device_name -> (action_state, rule_id))
+            schedule_states: Active schedules in the cluster
+                (device_name -> (state, schedule_id, details))
+            cluster_clean: Sensor values and rule inputs are unchanged since last tick
         """
-        key = (location, cluster, device_name)
-        
-        # Initialize automation context
-        if key not in self._automation_context:
-            self._automation_context[key] = {
-                'active_rule_ids': [],
-                'active_schedule_ids': [],
-                'pid_output': None,
-                'duty_cycle_percent': None,
-                'control_reason': None
-            }
-        
-        context = self._automation_context[key]
-        context['active_rule_ids'] = []
-        context['active_schedule_ids'] = []
-        context['control_reason'] = None
+        location, cluster, device_name = entry.key
+        relay_manager = self.relay_manager
+        dfr0971_manager = self.dfr0971_manager
+        
+        current_mode = relay_manager.get_device_mode(location, cluster, device_name)
+        current_state = relay_manager.get_device_state(location, cluster, device_name) or 0
+        
+        # A passive, unscheduled device that settled last tick would reach the
+        # same decision again if nothing changed; keep last tick's context
+        settled = (current_mode, current_state)
+        if (
+            cluster_clean and entry.passive and entry.settled == settled
+            and not self.scheduler.has_schedule(location, cluster, device_name)
+        ):
+            return
+        entry.settled = None
+        
+        # Reset the context in place; the lists are only read back when this
+        # tick's automation state is logged
+        context = entry.context
+        context.active_rule_ids.clear()
+        context.active_schedule_ids.clear()
+        context.control_reason = None
         
         # Log light intensity for dimmable lights (do this early so it happens even with early returns)
-        if device_info.get('dimming_enabled') and device_info.get('dimming_type') == 'dfr0971':
-            if self.dfr0971_manager:
-                board_id = device_info.get('dimming_board_id')
-                channel = device_info.get('dimming_channel')
-                if board_id is not None and channel is not None:
-                    intensity = self.dfr0971_manager.get_intensity(board_id, channel)
-                    if intensity is not None:
-                        # Set duty_cycle_percent to intensity for logging
-                        context['duty_cycle_percent'] = intensity
-                        if not context.get('control_reason'):
-                            context['control_reason'] = 'light'
+        if entry.dimmable and dfr0971_manager:
+            intensity = dfr0971_manager.get_intensity(entry.board_id, entry.channel)
+            if intensity is not None:
+                # Set duty_cycle_percent to intensity for logging
+                context.duty_cycle_percent = intensity
+                if not context.control_reason:
+                    context.control_reason = 'light'
         
         # Check if device is in manual mode
-        current_mode = self.relay_manager.get_device_mode(location, cluster, device_name)
         if current_mode == 'manual':
-            context['control_reason'] = 'manual'
+            context.control_reason = 'manual'
+            entry.settled = settled
             return  # Skip automatic control
         
-        # Get current state
-        current_state = self.relay_manager.get_device_state(location, cluster, device_name) or 0
-        
-        # 1. Evaluate rules (if schedule active)
-        rule_result = self.rules_engine.evaluate(location, cluster, sensor_values, current_time)
+        # 1. Rules (evaluated once per cluster, if schedule active)
+        rule_result = rule_hits.get(device_name)
         
         if rule_result:
-            device_name_from_rule, action_state, rule_id = rule_result
-            if device_name_from_rule == device_name:
-                # Rule applies to this device
-                if rule_id is not None:
-                    context['active_rule_ids'].append(rule_id)
-                context['control_reason'] = 'rule'
-                
-                if action_state != current_state:
-                    await self._set_device_state(
-                        location, cluster, device_name, action_state,
-                        'auto', 'rule', sensor_values
-                    )
-                return  # Rules execute first, skip schedules and PID
+            # Rule applies to this device
+            action_state, rule_id = rule_result
+            if rule_id is not None:
+                context.active_rule_ids.append(rule_id)
+            context.control_reason = 'rule'
+            
+            if action_state != current_state:
+                await self._set_device_state(
+                    location, cluster, device_name, current_state, action_state,
+                    'auto', 'rule'
+                )
+            else:
+                entry.settled = settled
+            return  # Rules execute first, skip schedules and PID
         
         # 2. Check schedules (only if no rule matched)
-        schedule_state, schedule_id = self.scheduler.get_schedule_state(
-            location, cluster, device_name, current_time
-        )
+        schedule_hit = schedule_states.get(device_name)
         
-        if schedule_state is not None:
+        if schedule_hit is not None:
+            schedule_state, schedule_id, schedule_details = schedule_hit
             if schedule_id is not None:
-                context['active_schedule_ids'].append(schedule_id)
-            context['control_reason'] = 'schedule'
+                context.active_schedule_ids.append(schedule_id)
+            context.control_reason = 'schedule'
             
-            # Get active schedule details (ramp durations, photoperiod) for logging
-            schedule_details = self.scheduler.get_active_schedule_details(
-                location, cluster, device_name, current_time
-            )
+            # Active schedule details (ramp durations, photoperiod) for logging
             if schedule_details:
-                context['schedule_ramp_up_duration'] = schedule_details.get('ramp_up_duration')
-                context['schedule_ramp_down_duration'] = schedule_details.get('ramp_down_duration')
-                context['schedule_photoperiod_hours'] = schedule_details.get('photoperiod_hours')
+                context.schedule_ramp_up_duration = schedule_details.get('ramp_up_duration')
+                context.schedule_ramp_down_duration = schedule_details.get('ramp_down_duration')
+                context.schedule_photoperiod_hours = schedule_details.get('photoperiod_hours')
             
-            # Check if this is a dimmable light with ramp schedule
-            if device_info.get('dimming_enabled') and device_info.get('dimming_type') == 'dfr0971':
-                if self.dfr0971_manager:
-                    board_id = device_info.get('dimming_board_id')
-                    channel = device_info.get('dimming_channel')
-                    if board_id is not None and channel is not None:
-                        # Get current intensity for ramp calculation
-                        current_intensity = self.dfr0971_manager.get_intensity(board_id, channel) or 0.0
-                        
-                        # Get schedule intensity (with ramp calculation)
-                        schedule_intensity = self.scheduler.get_schedule_intensity(
-                            location, cluster, device_name, current_time, current_intensity
-                        )
-                        
-                        if schedule_intensity is not None:
-                            # Apply schedule intensity to light
-                            success = self.dfr0971_manager.set_intensity(
-                                board_id, channel, schedule_intensity, store_to_eeprom=False
-                            )
-                            if success:
-                                # Set relay state: ON if intensity > 0, OFF if 0
-                                relay_state = 1 if schedule_intensity > 0 else 0
-                                if relay_state != current_state:
-                                    await self._set_device_state(
-                                        location, cluster, device_name, relay_state,
-                                        'scheduled', 'schedule', sensor_values
-                                    )
-                                
-                                # Store intensity in Redis for persistence
-                                if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-                                    voltage = (schedule_intensity / 100.0) * 10.0
-                                    self.database._automation_redis.write_light_intensity(
-                                        location, cluster, device_name,
-                                        schedule_intensity, voltage, board_id, channel
-                                    )
-                                
-                                logger.debug(
-                                    f"Schedule intensity {schedule_intensity:.1f}% applied to "
-                                    f"{location}/{cluster}/{device_name} (board {board_id}, channel {channel})"
-                                )
-                                return  # Schedule applied, skip PID
-                        else:
-                            # No intensity specified, use default ON/OFF behavior
-                            if schedule_state != current_state:
-                                await self._set_device_state(
-                                    location, cluster, device_name, schedule_state,
-                                    'scheduled', 'schedule', sensor_values
-                                )
-                            return  # Schedule applies, skip PID
+            # Default ON/OFF behavior, unless this is a dimmable light with a ramp schedule
+            relay_state = schedule_state
+            applied_intensity = None
+            if entry.dimmable and dfr0971_manager:
+                board_id = entry.board_id
+                channel = entry.channel
+                # Get current intensity for ramp calculation
+                current_intensity = dfr0971_manager.get_intensity(board_id, channel) or 0.0
+                
+                # Get schedule intensity (with ramp calculation)
+                schedule_intensity = self.scheduler.get_schedule_intensity(
+                    location, cluster, device_name, current_time, current_intensity
+                )
+                
+                if schedule_intensity is not None:
+                    # Apply schedule intensity to light
+                    if dfr0971_manager.set_intensity(
+                        board_id, channel, schedule_intensity, store_to_eeprom=False
+                    ):
+                        # Set relay state: ON if intensity > 0, OFF if 0
+                        relay_state = int(schedule_intensity > 0)
+                        applied_intensity = schedule_intensity
                     else:
-                        # Light device but missing board/channel config, use default ON/OFF
-                        if schedule_state != current_state:
-                            await self._set_device_state(
-                                location, cluster, device_name, schedule_state,
-                                'scheduled', 'schedule', sensor_values
-                            )
-                        return
-                else:
-                    # DFR0971 manager not available, use default ON/OFF
-                    if schedule_state != current_state:
-                        await self._set_device_state(
-                            location, cluster, device_name, schedule_state,
-                            'scheduled', 'schedule', sensor_values
-                        )
-                    return
-            else:
-                # Not a dimmable light, use default ON/OFF behavior
-                if schedule_state != current_state:
-                    await self._set_device_state(
-                        location, cluster, device_name, schedule_state,
-                        'scheduled', 'schedule', sensor_values
+                        relay_state = None  # Intensity not applied, fall through to PID/VPD
+            
+            if relay_state is not None:
+                await self._apply_schedule_onoff(location, cluster, device_name, relay_state, current_state)
+                
+                if applied_intensity is not None:
+                    # Store intensity in Redis for persistence (written in bulk at the end of the tick)
+                    redis_client = self.database._automation_redis
+                    if redis_client and redis_client.redis_enabled:
+                        voltage = (applied_intensity / 100.0) * 10.0
+                        self._pending_light_intensities.append((
+                            location, cluster, device_name,
+                            applied_intensity, voltage, board_id, channel
+                        ))
+                    
+                    logger.debug(
+                        "Schedule intensity %.1f%% applied to %s/%s/%s (board %s, channel %s)",
+                        applied_intensity, location, cluster, device_name, board_id, channel
                     )
                 return  # Schedule applies, skip PID
         
+        # No rule or schedule acted on the device
+        entry.settled = settled
+        
         # Check mode and failsafe before PID control
-        if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-            mode = self.database._automation_redis.read_mode(location, cluster) or 'auto'
-            failsafe = self.database._automation_redis.read_failsafe(location, cluster)
+        cluster_state = self._tick_cache.get(entry.cluster_key)
+        if cluster_state is not None:
+            mode = cluster_state['mode'] or 'auto'
+            failsafe = cluster_state['failsafe']
             
             # Skip PID if in failsafe or manual mode
             if failsafe or mode == 'failsafe':
-                logger.debug(f"Skipping PID control for {location}/{cluster}/{device_name}: failsafe active")
+                logger.debug("Skipping PID control for %s/%s/%s: failsafe active", location, cluster, device_name)
                 return
             if mode == 'manual':
-                logger.debug(f"Skipping PID control for {location}/{cluster}/{device_name}: manual mode")
+                logger.debug("Skipping PID control for %s/%s/%s: manual mode", location, cluster, device_name)
                 return
         
         # 3. PID control (only if no rule/schedule applied and mode allows)
-        if device_info.get('pid_enabled', False):
-            await self._process_pid_control(
-                location, cluster, device_name, device_info,
-                sensor_values, current_time, context
-            )
+        if entry.pid_enabled:
+            await self._process_pid_control(entry, sensor_values, current_time)
         
         # 4. VPD control for dehumidifying devices (fans, dehumidifiers)
-        device_type = device_info.get('device_type', '')
-        if device_type in ['fan', 'dehumidifier']:
-            await self._process_vpd_control(
-                location, cluster, device_name, device_info,
-                sensor_values, current_time, context
-            )
+        if entry.vpd_control:
+            await self._process_vpd_control(entry, sensor_values, current_time)
     
-    async def _process_pid_control(
+    async def _apply_schedule_onoff(
         self,
         location: str,
         cluster: str,
         device_name: str,
-        device_info: Dict[str, Any],
-        sensor_values: Dict[str, Optional[float]],
-        current_time: datetime,
-        context: Dict[str, Any]
-    ) -> None:
-        """Process PID control for a device.
+        state: int,
+        current_state: int
+    ) -> bool:
+        """Switch a scheduled device's relay if it differs from the schedule.
         
         Args:
             location: Location name
             cluster: Cluster name
             device_name: Device name
-            device_info: Device configuration
+            state: Relay state the schedule wants (0/1)
+            current_state: Current relay state
+        
+        Returns:
+            True if a state change was requested, False if already in that state
+        """
+        if state == current_state:
+            return False
+        await self._set_device_state(
+            location, cluster, device_name, current_state, state,
+            'scheduled', 'schedule'
+        )
+        return True
+    
+    async def _process_pid_control(
+        self,
+        entry: DeviceEntry,
+        sensor_values: Dict[str, Optional[float]],
+        current_time: datetime
+    ) -> None:
+        """Process PID control for a device.
+        
+        Args:
+            entry: Indexed device (key, configuration, automation context)
             sensor_values: Available sensor values
             current_time: Current time
-            context: Automation context dict
         """
-        key = (location, cluster, device_name)
-        device_type = device_info.get('device_type', '')
+        key = entry.key
+        location, cluster, device_name = key
+        context = entry.context
+        device_type = entry.device_type
         
-        # Get setpoint
-        setpoint_data = await self.database.get_setpoint(location, cluster)
+        # Get setpoint (prefetched for the tick)
+        setpoint_data = self._setpoints.get(entry.cluster_key)
         if not setpoint_data:
             return  # No setpoint configured
         
@@ -337,17 +711,12 @@ class ControlEngine:
         sensor_name = None
         setpoint_value = None
         
+        temperature_sensor, co2_sensor, _ = entry.control_sensors
         if device_type == 'heater':
-            sensor_mapping = self.config.get_sensor_mapping()
-            location_sensors = sensor_mapping.get(location, {})
-            cluster_sensors = location_sensors.get(cluster, {})
-            sensor_name = cluster_sensors.get('temperature_sensor')
+            sensor_name = temperature_sensor
             setpoint_value = setpoint_data.get('temperature')
         elif device_type == 'co2':
-            sensor_mapping = self.config.get_sensor_mapping()
-            location_sensors = sensor_mapping.get(location, {})
-            cluster_sensors = location_sensors.get(cluster, {})
-            sensor_name = cluster_sensors.get('co2_sensor')
+            sensor_name = co2_sensor
             setpoint_value = setpoint_data.get('co2')
         
         if not sensor_name or setpoint_value is None:
@@ -357,28 +726,29 @@ class ControlEngine:
         
         # Use last good value if sensor value is None
         if current_value is None:
-            if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-                last_good = self.database._automation_redis.read_last_good_value(cluster, sensor_name)
+            cluster_state = self._tick_cache.get(entry.cluster_key)
+            if cluster_state is not None:
+                last_good = cluster_state['last_good'].get(sensor_name)
                 if last_good:
-                    hold_period = self.config.get('control.last_good_hold_period', 30)
-                    is_valid, age = self.database._automation_redis.check_last_good_age(cluster, sensor_name, hold_period)
+                    hold_period = self._last_good_hold_period
+                    is_valid, age = self.database._automation_redis.last_good_age(last_good, hold_period)
                     if is_valid:
                         current_value = last_good['value']
-                        logger.debug(f"Using last good value for {sensor_name}: {current_value} (age: {age:.1f}s)")
+                        logger.debug("Using last good value for %s: %s (age: %.1fs)", sensor_name, current_value, age)
                     else:
                         # Last good value expired, trigger failsafe
                         if self.alarm_manager:
-                            self.alarm_manager.raise_alarm(
-                                location, cluster, f"{sensor_name}_offline",
-                                'critical', f"Sensor {sensor_name} offline for {age:.1f}s"
+                            self._queue_critical_alarm(
+                                entry, f"{sensor_name}_offline",
+                                f"Sensor {sensor_name} offline for {age:.1f}s"
                             )
                         return
                 else:
                     # No last good value, trigger alarm
                     if self.alarm_manager:
-                        self.alarm_manager.raise_alarm(
-                            location, cluster, f"{sensor_name}_offline",
-                            'critical', f"Sensor {sensor_name} offline, no last good value"
+                        self._queue_critical_alarm(
+                            entry, f"{sensor_name}_offline",
+                            f"Sensor {sensor_name} offline, no last good value"
                         )
                     return
             else:
@@ -386,17 +756,16 @@ class ControlEngine:
         
         # Update last good value if sensor is valid
         if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-            self.database._automation_redis.write_last_good_value(cluster, sensor_name, current_value)
+            self._pending_last_good[(cluster, sensor_name)] = current_value
         
         # Get or create PID controller
         if key not in self._pid_controllers:
             pid_params = self.config.get_pid_params_for_device(device_type)
-            pwm_period = device_info.get('pwm_period', 100)  # Default 100 seconds
             self._pid_controllers[key] = PIDController(
                 kp=pid_params['kp'],
                 ki=pid_params['ki'],
                 kd=pid_params['kd'],
-                pwm_period=pwm_period,
+                pwm_period=entry.pwm_period,
                 database=self.database,
                 device_type=device_type
             )
@@ -407,38 +776,34 @@ class ControlEngine:
         pid_controller.reload_parameters()
         
         # Compute PID output
-        pid_output = pid_controller.compute(setpoint_value, current_value, dt=1.0)
-        context['pid_output'] = pid_output
+        pid_output = pid_controller.compute(setpoint_value, current_value, dt=self._tick_dt)
+        context.pid_output = pid_output
         # Store PID K values for logging
-        context['pid_kp'] = pid_controller.kp
-        context['pid_ki'] = pid_controller.ki
-        context['pid_kd'] = pid_controller.kd
+        context.pid_kp = pid_controller.kp
+        context.pid_ki = pid_controller.ki
+        context.pid_kd = pid_controller.kd
         
         # Get PWM state
-        pwm_state = pid_controller.get_pwm_state(pid_output, current_time)
+        pwm_state = pid_controller.get_pwm_state(pid_output, self._last_tick_monotonic)
         duty_cycle = pid_controller.get_duty_cycle()
-        context['duty_cycle_percent'] = duty_cycle
-        context['control_reason'] = 'pid'
+        context.duty_cycle_percent = duty_cycle
+        context.control_reason = 'pid'
         
         # Apply PWM state
-        new_state = 1 if pwm_state else 0
+        new_state = int(pwm_state)
         current_state = self.relay_manager.get_device_state(location, cluster, device_name) or 0
         
         if new_state != current_state:
             await self._set_device_state(
-                location, cluster, device_name, new_state,
-                'auto', 'pid', sensor_values, setpoint_value
+                location, cluster, device_name, current_state, new_state,
+                'auto', 'pid', setpoint_value
             )
     
     async def _process_vpd_control(
         self,
-        location: str,
-        cluster: str,
-        device_name: str,
-        device_info: Dict[str, Any],
+        entry: DeviceEntry,
         sensor_values: Dict[str, Optional[float]],
-        current_time: datetime,
-        context: Dict[str, Any]
+        current_time: datetime
     ) -> None:
         """Process VPD-based control for dehumidifying devices (fans, dehumidifiers).
         
@@ -446,14 +811,12 @@ class ControlEngine:
         When VPD is at or above setpoint, turn OFF dehumidifying devices.
         
         Args:
-            location: Location name
-            cluster: Cluster name
-            device_name: Device name
-            device_info: Device configuration
+            entry: Indexed device (key, configuration, automation context)
             sensor_values: Available sensor values
             current_time: Current time
-            context: Automation context dict
         """
+        location, cluster, device_name = entry.key
+        context = entry.context
         try:
             # Get current mode to determine which setpoint to use
             current_mode_str = None
@@ -464,7 +827,10 @@ class ControlEngine:
                 pass
             
             # Get setpoint (use default/legacy for now, can be enhanced to use mode-based)
-            setpoint_data = await self.database.get_setpoint(location, cluster, current_mode_str)
+            if current_mode_str is None:
+                setpoint_data = self._setpoints.get(entry.cluster_key)
+            else:
+                setpoint_data = await self.database.get_setpoint(location, cluster, current_mode_str)
             if not setpoint_data:
                 return  # No setpoint configured
             
@@ -473,13 +839,10 @@ class ControlEngine:
                 return  # No VPD setpoint configured
             
             # Get VPD sensor name from mapping
-            sensor_mapping = self.config.get_sensor_mapping()
-            location_sensors = sensor_mapping.get(location, {})
-            cluster_sensors = location_sensors.get(cluster, {})
-            vpd_sensor_name = cluster_sensors.get('vpd_sensor')
+            _, _, vpd_sensor_name = entry.control_sensors
             
             if not vpd_sensor_name:
-                logger.debug(f"No VPD sensor mapping for {location}/{cluster}")
+                logger.debug("No VPD sensor mapping for %s/%s", location, cluster)
                 return
             
             # Get current VPD value
@@ -487,19 +850,20 @@ class ControlEngine:
             
             if current_vpd is None:
                 # Try to get from Redis last good value
-                if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-                    last_good = self.database._automation_redis.read_last_good_value(cluster, vpd_sensor_name)
+                cluster_state = self._tick_cache.get(entry.cluster_key)
+                if cluster_state is not None:
+                    last_good = cluster_state['last_good'].get(vpd_sensor_name)
                     if last_good:
-                        hold_period = self.config.get('control.last_good_hold_period', 30)
-                        is_valid, age = self.database._automation_redis.check_last_good_age(cluster, vpd_sensor_name, hold_period)
+                        hold_period = self._last_good_hold_period
+                        is_valid, age = self.database._automation_redis.last_good_age(last_good, hold_period)
                         if is_valid:
                             current_vpd = last_good['value']
                         else:
                             # Last good value expired
                             if self.alarm_manager:
-                                self.alarm_manager.raise_alarm(
-                                    location, cluster, f"{vpd_sensor_name}_offline",
-                                    'critical', f"VPD sensor {vpd_sensor_name} offline for {age:.1f}s"
+                                self._queue_critical_alarm(
+                                    entry, f"{vpd_sensor_name}_offline",
+                                    f"VPD sensor {vpd_sensor_name} offline for {age:.1f}s"
                                 )
                             return
                     else:
@@ -509,7 +873,7 @@ class ControlEngine:
             
             # Update last good value if sensor is valid
             if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-                self.database._automation_redis.write_last_good_value(cluster, vpd_sensor_name, current_vpd)
+                self._pending_last_good[(cluster, vpd_sensor_name)] = current_vpd
             
             # Control logic: If VPD < setpoint, turn ON dehumidifying device
             # If VPD >= setpoint, turn OFF dehumidifying device
@@ -517,47 +881,36 @@ class ControlEngine:
             hysteresis = 0.1  # kPa
             
             current_state = self.relay_manager.get_device_state(location, cluster, device_name) or 0
-            target_state = 0
             
-            if current_vpd < (vpd_setpoint - hysteresis):
-                # VPD is below setpoint, need to increase VPD → turn ON dehumidifying device
-                target_state = 1
-                context['control_reason'] = 'vpd_control'
-            elif current_vpd >= (vpd_setpoint + hysteresis):
-                # VPD is at or above setpoint → turn OFF dehumidifying device
-                target_state = 0
-                context['control_reason'] = 'vpd_control'
-            else:
-                # VPD is within hysteresis band, maintain current state
-                target_state = current_state
-                context['control_reason'] = 'vpd_control_hysteresis'
+            # Within the hysteresis band, maintain current state. Outside it,
+            # VPD below setpoint → ON (increase VPD), above setpoint → OFF
+            in_band = (vpd_setpoint - hysteresis) <= current_vpd < (vpd_setpoint + hysteresis)
+            target_state = current_state if in_band else int(current_vpd < vpd_setpoint)
+            context.control_reason = 'vpd_control_hysteresis' if in_band else 'vpd_control'
             
             # Set device state if changed
             if target_state != current_state:
                 await self._set_device_state(
-                    location, cluster, device_name, target_state,
-                    'auto', f'vpd_control (VPD: {current_vpd:.2f}kPa, setpoint: {vpd_setpoint:.2f}kPa)',
-                    sensor_values
+                    location, cluster, device_name, current_state, target_state,
+                    'auto', f'vpd_control (VPD: {current_vpd:.2f}kPa, setpoint: {vpd_setpoint:.2f}kPa)'
                 )
                 logger.info(
-                    f"VPD control: {location}/{cluster}/{device_name} "
-                    f"{'ON' if target_state == 1 else 'OFF'} "
-                    f"(VPD: {current_vpd:.2f}kPa, setpoint: {vpd_setpoint:.2f}kPa)"
+                    "VPD control: %s/%s/%s %s (VPD: %.2fkPa, setpoint: %.2fkPa)",
+                    location, cluster, device_name, 'ON' if target_state == 1 else 'OFF',
+                    current_vpd, vpd_setpoint
                 )
-        except Exception as e:
-            logger.error(f"Error in VPD control for {location}/{cluster}/{device_name}: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in VPD control for %s/%s/%s", location, cluster, device_name)
     
     async def _set_device_state(
         self,
         location: str,
         cluster: str,
         device_name: str,
+        current_state: int,
         state: int,
         mode: str,
         reason: str,
-        sensor_values: Dict[str, Optional[float]],
         setpoint: Optional[float] = None
     ) -> None:
         """Set device state and log action.
@@ -566,14 +919,12 @@ class ControlEngine:
             location: Location name
             cluster: Cluster name
             device_name: Device name
+            current_state: Relay state the caller read this tick (0/1)
             state: New state (0/1)
             mode: Control mode
             reason: Control reason
-            sensor_values: Sensor values for logging
             setpoint: Setpoint value for logging
         """
-        current_state = self.relay_manager.get_device_state(location, cluster, device_name) or 0
-        
         # Set device state
         success, error_reason = self.relay_manager.set_device_state(
             location, cluster, device_name, state, mode
@@ -587,47 +938,71 @@ class ControlEngine:
         # Get channel for logging
         channel = self.relay_manager.get_channel(location, cluster, device_name) or 0
         
-        # Get sensor value for logging (use first available)
-        sensor_value = None
-        for value in sensor_values.values():
-            if value is not None:
-                sensor_value = value
-                break
+        # Get sensor value for logging (first available, resolved once per cluster)
+        sensor_value = self._first_sensor_value.get((location, cluster))
         
-        # Log to database
-        await self.database.set_device_state(location, cluster, device_name, channel, state, mode)
-        await self.database.log_control_action(
+        # Log to database (device states and control history are flushed in bulk
+        # at the end of the tick)
+        self._pending_device_states.append((location, cluster, device_name, channel, state, mode))
+        self._pending_control_actions.append((
             location, cluster, device_name, channel,
             current_state, state, mode, reason,
             sensor_value, setpoint
-        )
+        ))
     
-    async def _log_automation_state(self) -> None:
-        """Log automation state for all devices."""
-        devices = self.config.get_devices()
+    async def _log_automation_state(self, current_time: datetime) -> None:
+        """Log automation state in one batch.
         
-        for location, clusters in devices.items():
-            for cluster, cluster_devices in clusters.items():
-                for device_name in cluster_devices.keys():
-                    key = (location, cluster, device_name)
-                    context = self._automation_context.get(key, {})
-                    
-                    current_state = self.relay_manager.get_device_state(location, cluster, device_name) or 0
-                    current_mode = self.relay_manager.get_device_mode(location, cluster, device_name) or 'auto'
-                    
-                    await self.database.log_automation_state(
-                        location, cluster, device_name,
-                        current_state, current_mode,
-                        context.get('pid_output'),
-                        context.get('duty_cycle_percent'),
-                        context.get('active_rule_ids', []),
-                        context.get('active_schedule_ids', []),
-                        context.get('control_reason', 'unknown'),
-                        context.get('schedule_ramp_up_duration'),
-                        context.get('schedule_ramp_down_duration'),
-                        context.get('schedule_photoperiod_hours'),
-                        context.get('pid_kp'),
-                        context.get('pid_ki'),
-                        context.get('pid_kd')
-                    )
+        Devices whose state is unchanged since their last row only refresh
+        their Redis state key until the heartbeat period
+        (control.automation_state_heartbeat, seconds; 0 logs every tick)
+        has elapsed.
+        
+        Args:
+            current_time: Current time
+        """
+        states = []
+        keepalive_states = []
+        relay_manager = self.relay_manager
+        heartbeat = self._state_heartbeat
+        
+        for entry in self._device_entries:
+            location, cluster, device_name = entry.key
+            context = entry.context
+            
+            current_state = relay_manager.get_device_state(location, cluster, device_name) or 0
+            current_mode = relay_manager.get_device_mode(location, cluster, device_name) or 'auto'
+            
+            state = (
+                location, cluster, device_name,
+                current_state, current_mode,
+                context.pid_output,
+                context.duty_cycle_percent,
+                context.active_rule_ids,
+                context.active_schedule_ids,
+                context.control_reason,
+                context.schedule_ramp_up_duration,
+                context.schedule_ramp_down_duration,
+                context.schedule_photoperiod_hours,
+                context.pid_kp,
+                context.pid_ki,
+                context.pid_kd
+            )
+            # Rule/schedule id lists are reused across ticks, so compare copies
+            logged_state = (
+                state[:7]
+                + (tuple(context.active_rule_ids), tuple(context.active_schedule_ids))
+                + state[9:]
+            )
+            if (
+                logged_state == entry.logged_state
+                and (current_time - entry.logged_at).total_seconds() < heartbeat
+            ):
+                keepalive_states.append(state)
+                continue
+            entry.logged_state = logged_state
+            entry.logged_at = current_time
+            states.append(state)
+        
+        await self.database.log_automation_state_bulk(states, keepalive_states)
 
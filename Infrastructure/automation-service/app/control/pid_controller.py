@@ -1,7 +1,7 @@
 """PID controller for temperature and CO2 control."""
 import logging
+import time
 from typing import Dict, Optional
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -34,17 +34,20 @@ class PIDController:
         self.pwm_period = pwm_period
         self.database = database
         self.device_type = device_type
-        self._last_reload_time: Optional[datetime] = None
+        # Parameters can only be reloaded with a database and device type
+        self._reload_enabled = bool(database and device_type)
+        # Internal clocks are time.monotonic() seconds
+        self._last_reload_time: Optional[float] = None
         
         # PID state
         self._integral = 0.0
         self._last_error = 0.0
-        self._last_time: Optional[datetime] = None
+        self._last_time: Optional[float] = None
         
         # PWM state
-        self._pwm_start_time: Optional[datetime] = None
+        self._pwm_start_time: Optional[float] = None
         self._pwm_duty_cycle = 0.0  # 0-100%
-        self._pwm_current_state = False  # Current ON/OFF state within period
+        self._pwm_on_seconds = 0.0  # ON time per period at the current duty cycle
         
         # Anti-windup
         self._integral_max = 100.0
@@ -86,16 +89,16 @@ class PIDController:
         
         # Update state
         self._last_error = error
-        self._last_time = datetime.now()
+        self._last_time = time.monotonic()
         
         return output
     
-    def get_pwm_state(self, pid_output: float, current_time: datetime) -> bool:
+    def get_pwm_state(self, pid_output: float, current_time: float) -> bool:
         """Get current PWM state (ON/OFF) based on PID output and time.
         
         Args:
             pid_output: PID output percentage (0-100%)
-            current_time: Current time
+            current_time: Current time in time.monotonic() seconds
         
         Returns:
             True if device should be ON, False if OFF
@@ -103,27 +106,18 @@ class PIDController:
         # Update duty cycle if PID output changed
         if abs(self._pwm_duty_cycle - pid_output) > 0.1:  # Threshold to avoid jitter
             self._pwm_duty_cycle = pid_output
+            self._pwm_on_seconds = (pid_output / 100.0) * self.pwm_period
             self._pwm_start_time = current_time
-            self._pwm_current_state = False  # Start with OFF
         
         if self._pwm_start_time is None:
             self._pwm_start_time = current_time
         
         # Calculate elapsed time in current period
-        elapsed = (current_time - self._pwm_start_time).total_seconds()
+        elapsed = current_time - self._pwm_start_time
         elapsed = elapsed % self.pwm_period  # Wrap around if period exceeded
         
-        # Calculate ON and OFF durations
-        on_duration = (self._pwm_duty_cycle / 100.0) * self.pwm_period
-        off_duration = self.pwm_period - on_duration
-        
-        # Determine current state
-        if elapsed < on_duration:
-            self._pwm_current_state = True
-        else:
-            self._pwm_current_state = False
-        
-        return self._pwm_current_state
+        # ON for the first part of each period
+        return elapsed < self._pwm_on_seconds
     
     def get_duty_cycle(self) -> float:
         """Get current duty cycle percentage."""
@@ -136,7 +130,7 @@ class PIDController:
         self._last_time = None
         self._pwm_start_time = None
         self._pwm_duty_cycle = 0.0
-        self._pwm_current_state = False
+        self._pwm_on_seconds = 0.0
     
     def reload_parameters(self) -> None:
         """Reload PID parameters from Redis/DB if changed.
@@ -144,18 +138,26 @@ class PIDController:
         Checks Redis first (fast), falls back to database if Redis unavailable.
         Only reloads if parameters have changed.
         """
-        if not self.database or not self.device_type:
+        if not self._reload_enabled:
             return
         
         # Rate limit reloads (check at most once per second)
-        now = datetime.now()
-        if self._last_reload_time and (now - self._last_reload_time).total_seconds() < 1.0:
+        now = time.monotonic()
+        if self._last_reload_time is not None and now - self._last_reload_time < 1.0:
             return
         
+        redis_client = self.database._automation_redis
+        if redis_client is None:
+            # The Redis client is only created during database initialization
+            # and there is no database fallback, so there is nothing to poll
+            self._reload_enabled = False
+            return
+        self._last_reload_time = now
+        
         try:
             # Try Redis first
-            if self.database._automation_redis and self.database._automation_redis.redis_enabled:
-                redis_params = self.database._automation_redis.read_pid_parameters(self.device_type)
+            if redis_client.redis_enabled:
+                redis_params = redis_client.read_pid_parameters(self.device_type)
                 if redis_params:
                     new_kp = redis_params.get('kp')
                     new_ki = redis_params.get('ki')
@@ -169,7 +171,6 @@ class PIDController:
                         self.ki = new_ki if new_ki is not None else self.ki
                         self.kd = new_kd if new_kd is not None else self.kd
                         logger.info(f"PID parameters reloaded for {self.device_type}: Kp={old_kp}->{self.kp}, Ki={old_ki}->{self.ki}, Kd={old_kd}->{self.kd}")
-                        self._last_reload_time = now
                     return
             
             # Fallback to database (async, but we'll do it synchronously here)
@@ -177,6 +178,4 @@ class PIDController:
             # For now, we'll just check Redis
         except Exception as e:
             logger.debug(f"Error reloading PID parameters: {e}")
-        
-        self._last_reload_time = now
 
@@ -16,8 +16,44 @@ class Scheduler:
             schedules: List of schedule dictionaries from database or config
         """
         self.schedules = schedules
+        self._index_devices()
         logger.info(f"Initialized scheduler with {len(schedules)} schedules")
     
+    def _index_devices(self) -> None:
+        """Index enabled schedules by location/cluster and the devices they control.
+        
+        Start/end times are parsed here once; schedules without a valid time
+        range can never be active and are left out of the cluster index.
+        """
+        self._scheduled_devices = set()
+        self._by_cluster: Dict[Tuple[str, str], List[Tuple[Dict[str, Any], time, time]]] = {}
+        for schedule in self.schedules:
+            if not schedule.get('enabled', True):
+                continue
+            location = schedule.get('location')
+            cluster = schedule.get('cluster')
+            self._scheduled_devices.add((location, cluster, schedule.get('device_name')))
+            
+            start_time = self._parse_time(schedule.get('start_time'))
+            end_time = self._parse_time(schedule.get('end_time'))
+            if start_time and end_time:
+                self._by_cluster.setdefault((location, cluster), []).append(
+                    (schedule, start_time, end_time)
+                )
+    
+    def has_schedule(self, location: str, cluster: str, device_name: str) -> bool:
+        """Check if a device has any enabled schedule, active or not.
+        
+        Args:
+            location: Location name
+            cluster: Cluster name
+            device_name: Device name
+        
+        Returns:
+            True if the device's control can change with the time of day
+        """
+        return (location, cluster, device_name) in self._scheduled_devices
+    
     def is_schedule_active(
         self, 
         location: str, 
@@ -99,6 +135,87 @@ class Scheduler:
             return 1
         return None
     
+    def get_schedule_states_bulk(
+        self,
+        location: str,
+        cluster: str,
+        current_time: Optional[datetime] = None
+    ) -> Dict[str, Tuple[int, Optional[int], Dict[str, Any]]]:
+        """Get schedule state, id and details for every device in a location/cluster.
+        
+        Equivalent to calling get_schedule_state and get_active_schedule_details
+        per device, in one pass over the cluster's schedules.
+        
+        Args:
+            location: Location name
+            cluster: Cluster name
+            current_time: Current time (default: now)
+        
+        Returns:
+            Dict mapping device_name to (state, schedule_id, details) for devices
+            with an active schedule; details as from get_active_schedule_details
+        """
+        if current_time is None:
+            current_time = datetime.now()
+        
+        current_time_obj = current_time.time()
+        current_weekday = current_time.weekday()
+        
+        states: Dict[str, Tuple[int, Optional[int], Dict[str, Any]]] = {}
+        for schedule, start_time, end_time in self._by_cluster.get((location, cluster), ()):
+            device_name = schedule.get('device_name')
+            if device_name in states:
+                continue  # First active schedule wins, as in is_schedule_active
+            
+            day_of_week = schedule.get('day_of_week')
+            if day_of_week is not None and day_of_week != current_weekday:
+                continue
+            
+            if start_time > end_time:
+                is_in_range = current_time_obj >= start_time or current_time_obj < end_time
+            else:
+                is_in_range = start_time <= current_time_obj < end_time
+            
+            if is_in_range:
+                # Active schedule means ON (see get_schedule_state)
+                states[device_name] = (
+                    1, schedule.get('id'), self._schedule_details(schedule, start_time, end_time)
+                )
+        
+        return states
+    
+    def _schedule_details(
+        self,
+        schedule: Dict[str, Any],
+        start_time: time,
+        end_time: time
+    ) -> Dict[str, Any]:
+        """Build the details dict for an active schedule.
+        
+        Args:
+            schedule: Schedule dictionary
+            start_time: Parsed start time
+            end_time: Parsed end time
+        
+        Returns:
+            Dict with ramp_up_duration, ramp_down_duration, start_time, end_time, photoperiod_hours
+        """
+        # Calculate photoperiod (duration of schedule in hours)
+        start_minutes = start_time.hour * 60 + start_time.minute
+        end_minutes = end_time.hour * 60 + end_time.minute
+        if end_minutes < start_minutes:
+            photoperiod_hours = (end_minutes + 1440 - start_minutes) / 60.0
+        else:
+            photoperiod_hours = (end_minutes - start_minutes) / 60.0
+        
+        return {
+            'ramp_up_duration': schedule.get('ramp_up_duration'),
+            'ramp_down_duration': schedule.get('ramp_down_duration'),
+            'start_time': schedule.get('start_time'),
+            'end_time': schedule.get('end_time'),
+            'photoperiod_hours': photoperiod_hours
+        }
+    
     def get_active_schedule_details(
         self,
         location: str,
@@ -149,21 +266,7 @@ class Scheduler:
                     is_in_range = start_time <= current_time_obj < end_time
                 
                 if is_in_range:
-                    # Calculate photoperiod (duration of schedule in hours)
-                    start_minutes = start_time.hour * 60 + start_time.minute
-                    end_minutes = end_time.hour * 60 + end_time.minute
-                    if end_minutes < start_minutes:
-                        photoperiod_hours = (end_minutes + 1440 - start_minutes) / 60.0
-                    else:
-                        photoperiod_hours = (end_minutes - start_minutes) / 60.0
-                    
-                    return {
-                        'ramp_up_duration': schedule.get('ramp_up_duration'),
-                        'ramp_down_duration': schedule.get('ramp_down_duration'),
-                        'start_time': schedule.get('start_time'),
-                        'end_time': schedule.get('end_time'),
-                        'photoperiod_hours': photoperiod_hours
-                    }
+                    return self._schedule_details(schedule, start_time, end_time)
         
         return None
     
@@ -194,13 +297,9 @@ class Scheduler:
         current_time_obj = current_time.time()
         current_weekday = current_time.weekday()  # 0 = Monday, 6 = Sunday
         
-        for schedule in self.schedules:
-            if not schedule.get('enabled', True):
-                continue
-            
-            if (schedule.get('location') == location and
-                schedule.get('cluster') == cluster and
-                schedule.get('device_name') == device_name):
+        # Walk the pre-parsed cluster index (enabled schedules, in schedule order)
+        for schedule, start_time, end_time in self._by_cluster.get((location, cluster), ()):
+            if schedule.get('device_name') == device_name:
                 
                 # Check day of week
                 day_of_week = schedule.get('day_of_week')
@@ -208,12 +307,6 @@ class Scheduler:
                     continue
                 
                 # Check time range
-                start_time = self._parse_time(schedule.get('start_time'))
-                end_time = self._parse_time(schedule.get('end_time'))
-                
-                if not start_time or not end_time:
-                    continue
-                
                 is_in_range = False
                 if start_time > end_time:
                     # Overnight schedule
@@ -306,5 +399,6 @@ class Scheduler:
     def update_schedules(self, schedules: List[Dict[str, any]]):
         """Update schedules list."""
         self.schedules = schedules
+        self._index_devices()
         logger.info(f"Updated schedules: {len(schedules)} schedules")
 
@@ -3,7 +3,7 @@ import os
 import logging
 import asyncio
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import asyncpg
 import redis
 from app.redis_client import AutomationRedisClient
@@ -470,6 +470,77 @@ class DatabaseManager:
         
         return None
     
+    async def get_sensor_values(self, sensor_names: List[str]) -> Dict[str, Optional[float]]:
+        """Get latest values for several sensors from Redis or TimescaleDB fallback.
+        
+        Uses one Redis MGET for all sensors and a single TimescaleDB query for
+        any sensors Redis could not serve.
+        
+        Args:
+            sensor_names: Sensor names (e.g., ['dry_bulb_f', 'rh_b', 'co2_f'])
+        
+        Returns:
+            Dict mapping each sensor name to its value as float, or None if not found
+        """
+        values: Dict[str, Optional[float]] = dict.fromkeys(sensor_names)
+        if not values:
+            return values
+        
+        missing = list(values)
+        
+        # Try Redis first
+        if self._redis_enabled and self._redis_client:
+            try:
+                raw_values = self._redis_client.mget([f"sensor:{name}" for name in missing])
+                still_missing = []
+                for name, value in zip(missing, raw_values):
+                    if value is not None:
+                        try:
+                            values[name] = float(value)
+                            continue
+                        except (ValueError, TypeError):
+                            pass
+                    still_missing.append(name)
+                missing = still_missing
+            except Exception as e:
+                logger.debug(f"Redis read failed for sensors {missing}: {e}")
+                # Try to reconnect
+                try:
+                    await self._connect_redis()
+                except Exception:
+                    pass
+        
+        if not missing:
+            return values
+        
+        # Fallback to TimescaleDB (using measurement table)
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                # Latest measurement per requested sensor name
+                rows = await conn.fetch("""
+                    SELECT n.name, latest.value
+                    FROM unnest($1::text[]) AS n(name)
+                    CROSS JOIN LATERAL (
+                        SELECT m.value
+                        FROM measurement m
+                        JOIN sensor s ON m.sensor_id = s.sensor_id
+                        WHERE s.name = n.name
+                        ORDER BY m.time DESC
+                        LIMIT 1
+                    ) latest
+                """, missing)
+                
+                for row in rows:
+                    if row['value'] is not None:
+                        try:
+                            values[row['name']] = float(row['value'])
+                        except (ValueError, TypeError):
+                            pass
+        except Exception as e:
+            logger.error(f"Error reading sensors {missing} from TimescaleDB: {e}")
+        
+        return values
     
     async def get_device_state(self, location: str, cluster: str, device_name: str) -> Optional[Dict[str, Any]]:
         """Get device state from database."""
@@ -556,6 +627,47 @@ class DatabaseManager:
         
         return db_success
     
+    async def set_device_states_bulk(
+        self,
+        states: List[Tuple[str, str, str, int, int, str]]
+    ) -> bool:
+        """Set several device states in database and Redis state keys in one round trip.
+        
+        Args:
+            states: List of tuples in set_device_state argument order
+                (location, cluster, device_name, channel, state, mode)
+        
+        Returns:
+            True if the database write succeeded, False otherwise
+        """
+        if not states:
+            return True
+        
+        # Write to TimescaleDB
+        db_success = False
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                await conn.executemany("""
+                    INSERT INTO device_states (location, cluster, device_name, channel, state, mode, updated_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, NOW())
+                    ON CONFLICT (location, cluster, device_name)
+                    DO UPDATE SET state = EXCLUDED.state, mode = EXCLUDED.mode, 
+                                  channel = EXCLUDED.channel, updated_at = NOW()
+                """, states)
+                db_success = True
+        except Exception as e:
+            logger.error(f"Error setting device states: {e}")
+        
+        # Write to Redis state keys (for live device state)
+        if self._automation_redis and self._automation_redis.redis_enabled:
+            for location, cluster, device_name, _, state, mode in states:
+                self._automation_redis.write_to_state(
+                    location, cluster, device_name, state, mode
+                )
+        
+        return db_success
+    
     async def log_control_action(
         self,
         location: str,
@@ -585,6 +697,36 @@ class DatabaseManager:
             logger.error(f"Error logging control action: {e}")
             return False
     
+    async def log_control_actions_bulk(
+        self,
+        actions: List[Tuple[str, str, str, int, Optional[int], Optional[int], str, str, Optional[float], Optional[float]]]
+    ) -> bool:
+        """Log several control actions to control_history in one round trip.
+        
+        Args:
+            actions: List of tuples in log_control_action argument order
+                (location, cluster, device_name, channel, old_state, new_state,
+                mode, reason, sensor_value, setpoint)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not actions:
+            return True
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                await conn.executemany("""
+                    INSERT INTO control_history 
+                    (timestamp, location, cluster, device_name, channel, old_state, new_state, 
+                     mode, reason, sensor_value, setpoint)
+                    VALUES (NOW(), $1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                """, actions)
+                return True
+        except Exception as e:
+            logger.error(f"Error logging control actions: {e}")
+            return False
+    
     async def log_automation_state(
         self,
         location: str,
@@ -640,6 +782,74 @@ class DatabaseManager:
         
         return db_success
     
+    async def log_automation_state_bulk(
+        self,
+        states: List[Tuple[Any, ...]],
+        keepalive_states: Optional[List[Tuple[Any, ...]]] = None
+    ) -> bool:
+        """Log automation state for several devices in one round trip.
+        
+        Rows go to automation_state with a single executemany; Redis Stream
+        and state keys are written per row as in log_automation_state.
+        
+        Args:
+            states: List of tuples in log_automation_state argument order
+                (location, cluster, device_name, device_state, device_mode,
+                pid_output, duty_cycle_percent, active_rule_ids,
+                active_schedule_ids, control_reason, schedule_ramp_up_duration,
+                schedule_ramp_down_duration, schedule_photoperiod_hours,
+                pid_kp, pid_ki, pid_kd)
+            keepalive_states: Rows in the same order that are unchanged since
+                they were last logged; only their Redis state keys are
+                refreshed so they don't expire
+        
+        Returns:
+            True if the database write succeeded, False otherwise
+        """
+        if keepalive_states and self._automation_redis and self._automation_redis.redis_enabled:
+            for (location, cluster, device_name, device_state, device_mode,
+                 pid_output, duty_cycle_percent, *_) in keepalive_states:
+                self._automation_redis.write_to_state(
+                    location, cluster, device_name, device_state, device_mode,
+                    pid_output, duty_cycle_percent
+                )
+        
+        if not states:
+            return True
+        
+        # Write to TimescaleDB
+        db_success = False
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                await conn.executemany("""
+                    INSERT INTO automation_state 
+                    (timestamp, location, cluster, device_name, device_state, device_mode,
+                     pid_output, duty_cycle_percent, active_rule_ids, active_schedule_ids, 
+                     control_reason, schedule_ramp_up_duration, schedule_ramp_down_duration,
+                     schedule_photoperiod_hours, pid_kp, pid_ki, pid_kd, updated_at)
+                    VALUES (NOW(), $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, NOW())
+                """, states)
+                db_success = True
+        except Exception as e:
+            logger.error(f"Error logging automation state to database: {e}")
+        
+        # Write to Redis Stream and state keys
+        if self._automation_redis and self._automation_redis.redis_enabled:
+            for (location, cluster, device_name, device_state, device_mode,
+                 pid_output, duty_cycle_percent, active_rule_ids, active_schedule_ids,
+                 control_reason, *_) in states:
+                self._automation_redis.write_to_stream(
+                    location, cluster, device_name, device_state, device_mode,
+                    pid_output, duty_cycle_percent, active_rule_ids, active_schedule_ids, control_reason
+                )
+                self._automation_redis.write_to_state(
+                    location, cluster, device_name, device_state, device_mode,
+                    pid_output, duty_cycle_percent
+                )
+        
+        return db_success
+    
     async def get_setpoint(self, location: str, cluster: str, mode: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Get setpoints for location/cluster.
         
@@ -706,6 +916,94 @@ class DatabaseManager:
             logger.error(f"Error getting setpoint: {e}")
         return None
     
+    async def get_setpoints_bulk(
+        self,
+        keys: List[Tuple[str, str]],
+        mode: Optional[str] = None
+    ) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """Get setpoints for several locations/clusters.
+        
+        Same lookup as get_setpoint, but with one Redis MGET and a single
+        database query for every location/cluster Redis could not serve.
+        
+        Args:
+            keys: List of (location, cluster) tuples
+            mode: Mode (DAY/NIGHT/TRANSITION) or None for legacy/default setpoint
+        
+        Returns:
+            Dict mapping each (location, cluster) to its setpoint dict, or None if not found
+        """
+        setpoints: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = dict.fromkeys(keys)
+        if not setpoints:
+            return setpoints
+        
+        # Normalize mode: None becomes NULL in database (legacy behavior)
+        db_mode = mode if mode else None
+        
+        # Try Redis first (Redis doesn't support mode yet, so only for legacy mode=NULL)
+        missing = list(setpoints)
+        if db_mode is None and self._automation_redis and self._automation_redis.redis_enabled:
+            redis_setpoints = self._automation_redis.read_setpoints_bulk(missing)
+            still_missing = []
+            for key in missing:
+                redis_setpoint = redis_setpoints.get(key)
+                if redis_setpoint and (
+                    'temperature' in redis_setpoint or 'humidity' in redis_setpoint or 'co2' in redis_setpoint
+                ):
+                    # May be partial if TTL expired on some keys
+                    setpoints[key] = {
+                        'temperature': redis_setpoint.get('temperature'),
+                        'humidity': redis_setpoint.get('humidity'),
+                        'co2': redis_setpoint.get('co2'),
+                        'vpd': redis_setpoint.get('vpd'),
+                        'mode': None
+                    }
+                else:
+                    still_missing.append(key)
+            missing = still_missing
+        
+        if not missing:
+            return setpoints
+        
+        # Fallback to database (Redis unavailable, TTL expired, or mode-based setpoint)
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT s.location, s.cluster, s.temperature, s.humidity, s.co2, s.vpd, s.mode
+                    FROM setpoints s
+                    JOIN unnest($1::text[], $2::text[]) AS k(location, cluster)
+                        ON s.location = k.location AND s.cluster = k.cluster
+                    WHERE (s.mode = $3 OR (s.mode IS NULL AND $3 IS NULL))
+                """, [location for location, _ in missing], [cluster for _, cluster in missing], db_mode)
+                
+                for row in rows:
+                    key = (row['location'], row['cluster'])
+                    if setpoints.get(key) is not None:
+                        continue
+                    setpoint_data = {
+                        'temperature': row['temperature'],
+                        'humidity': row['humidity'],
+                        'co2': row['co2'],
+                        'vpd': row['vpd'],
+                        'mode': row['mode']
+                    }
+                    setpoints[key] = setpoint_data
+                    
+                    # Cache in Redis for future reads (only for legacy mode=NULL)
+                    if db_mode is None and self._automation_redis and self._automation_redis.redis_enabled:
+                        self._automation_redis.write_setpoint(
+                            key[0], key[1],
+                            setpoint_data['temperature'],
+                            setpoint_data['humidity'],
+                            setpoint_data['co2'],
+                            source='api'  # From database, so source is 'api'
+                        )
+        except Exception as e:
+            logger.error(f"Error getting setpoints: {e}")
+        
+        return setpoints
+    
     async def set_setpoint(
         self, 
         location: str, 
@@ -967,6 +1265,37 @@ class DatabaseManager:
             logger.error(f"Error getting PID parameters: {e}")
         return None
     
+    async def get_pid_parameters_bulk(self, device_types: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get PID parameters for several device types in one query.
+        
+        Args:
+            device_types: Device types (e.g., ['heater', 'co2'])
+        
+        Returns:
+            Dict mapping device_type to parameter dict (missing types are omitted)
+        """
+        if not device_types:
+            return {}
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT device_type, kp, ki, kd, updated_at, updated_by, source
+                    FROM pid_parameters
+                    WHERE device_type = ANY($1::text[])
+                """, device_types)
+                return {row['device_type']: {
+                    'kp': row['kp'],
+                    'ki': row['ki'],
+                    'kd': row['kd'],
+                    'updated_at': row['updated_at'],
+                    'updated_by': row['updated_by'],
+                    'source': row['source']
+                } for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting PID parameters: {e}")
+        return {}
+    
     async def set_pid_parameters(
         self,
         device_type: str,
@@ -1022,6 +1351,56 @@ class DatabaseManager:
             logger.error(f"Error setting PID parameters: {e}")
             return False
     
+    async def set_pid_parameters_bulk(
+        self,
+        updates: List[Tuple[str, float, float, float, str]],
+        updated_by: Optional[str] = None
+    ) -> bool:
+        """Write changed PID parameters for several device types in one transaction.
+        
+        Callers pass only rows that differ from the database, so every row is
+        also logged to pid_parameter_history.
+        
+        Args:
+            updates: List of (device_type, kp, ki, kd, source) tuples
+            updated_by: Optional identifier of who made the update
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not updates:
+            return True
+        try:
+            pool = await self._get_pool()
+            async with pool.acquire() as conn:
+                async with conn.transaction():
+                    rows = [
+                        (device_type, kp, ki, kd, updated_by, source)
+                        for device_type, kp, ki, kd, source in updates
+                    ]
+                    await conn.executemany("""
+                        INSERT INTO pid_parameters (device_type, kp, ki, kd, updated_at, updated_by, source)
+                        VALUES ($1, $2, $3, $4, NOW(), $5, $6)
+                        ON CONFLICT (device_type)
+                        DO UPDATE SET 
+                            kp = EXCLUDED.kp,
+                            ki = EXCLUDED.ki,
+                            kd = EXCLUDED.kd,
+                            updated_at = NOW(),
+                            updated_by = EXCLUDED.updated_by,
+                            source = EXCLUDED.source
+                    """, rows)
+                    await conn.executemany("""
+                        INSERT INTO pid_parameter_history (timestamp, device_type, kp, ki, kd, updated_by, source)
+                        VALUES (NOW(), $1, $2, $3, $4, $5, $6)
+                    """, rows)
+            for device_type, kp, ki, kd, source in updates:
+                logger.info(f"PID parameters updated for {device_type}: Kp={kp}, Ki={ki}, Kd={kd} (source: {source})")
+            return True
+        except Exception as e:
+            logger.error(f"Error setting PID parameters: {e}")
+            return False
+    
     async def get_pid_parameter_history(
         self,
         device_type: str,
@@ -107,8 +107,7 @@ async def lifespan(app: FastAPI):
             Returns:
                 Load percentage (0-100) or None if not available
             """
-            devices = config.get_devices()
-            device_info = devices.get(location, {}).get(cluster, {}).get(device_name)
+            device_info = config.get_device_info(location, cluster, device_name)
             
             if not device_info:
                 return None
@@ -196,8 +195,7 @@ async def lifespan(app: FastAPI):
         # Create enhanced callback that can access both DFR0971 and PID controllers
         def get_device_load_enhanced(location: str, cluster: str, device_name: str) -> Optional[float]:
             """Enhanced device load callback with PID controller support."""
-            devices = config.get_devices()
-            device_info = devices.get(location, {}).get(cluster, {}).get(device_name)
+            device_info = config.get_device_info(location, cluster, device_name)
             
             if not device_info:
                 return None
@@ -374,10 +372,10 @@ async def populate_redis_from_database(database: DatabaseManager, config: Config
                 # Set default mode to 'auto'
                 redis_client.write_mode(location, cluster, 'auto', source='system')
     
-    # Populate PID parameters
+    # Populate PID parameters (single query for all device types)
     device_types = ['heater', 'co2']
-    for device_type in device_types:
-        params = await database.get_pid_parameters(device_type)
+    pid_params_by_type = await database.get_pid_parameters_bulk(device_types)
+    for device_type, params in pid_params_by_type.items():
         if params:
             redis_client.write_pid_parameters(
                 device_type,
@@ -619,5 +617,5 @@ else:
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    uvicorn.run(app, host="0.0.0.0", port=8001, loop="uvloop")
 
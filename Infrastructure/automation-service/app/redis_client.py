@@ -2,12 +2,16 @@
 import os
 import json
 import logging
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple
 import redis
 
 logger = logging.getLogger(__name__)
 
+# Pub/sub channel notified whenever PID parameters are written (payload: device_type)
+PID_CHANGED_CHANNEL = 'automation:pid_changed'
+
 
 class AutomationRedisClient:
     """Redis client for automation service.
@@ -225,30 +229,80 @@ class AutomationRedisClient:
             co2 = self.redis_client.get(co2_key)
             source_data = self.redis_client.get(source_key)
             
-            if temp is None and hum is None and co2 is None:
-                return None
-            
-            result = {}
-            if temp is not None:
-                result['temperature'] = float(temp)
-            if hum is not None:
-                result['humidity'] = float(hum)
-            if co2 is not None:
-                result['co2'] = float(co2)
-            
-            if source_data:
-                try:
-                    source_info = json.loads(source_data)
-                    result['source'] = source_info.get('source', 'unknown')
-                    result['timestamp_ms'] = source_info.get('timestamp', 0)
-                except (json.JSONDecodeError, TypeError):
-                    pass
-            
-            return result if result else None
+            return self._parse_setpoint(temp, hum, co2, source_data)
         except Exception as e:
             logger.warning(f"Error reading setpoint from Redis: {e}")
             return None
     
+    def read_setpoints_bulk(
+        self,
+        keys: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """Read setpoints for several locations/clusters with one MGET.
+        
+        Args:
+            keys: List of (location, cluster) tuples
+        
+        Returns:
+            Dict mapping (location, cluster) to the read_setpoint result; empty
+            if Redis is unavailable or the read fails
+        """
+        if not self.redis_enabled or not self.redis_client or not keys:
+            return {}
+        
+        try:
+            values = self.redis_client.mget([
+                f"setpoint:{location}:{cluster}:{field}"
+                for location, cluster in keys
+                for field in ('temperature', 'humidity', 'co2', 'source')
+            ])
+            return {
+                key: self._parse_setpoint(*values[i * 4:i * 4 + 4])
+                for i, key in enumerate(keys)
+            }
+        except Exception as e:
+            logger.warning(f"Error reading setpoints from Redis: {e}")
+            return {}
+    
+    def _parse_setpoint(
+        self,
+        temp: Optional[str],
+        hum: Optional[str],
+        co2: Optional[str],
+        source_data: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Build a setpoint dict from raw Redis values.
+        
+        Args:
+            temp: Temperature setpoint value
+            hum: Humidity setpoint value
+            co2: CO2 setpoint value
+            source_data: JSON source information
+        
+        Returns:
+            Dict with temperature, humidity, co2, source, timestamp_ms, or None if no setpoint values
+        """
+        if temp is None and hum is None and co2 is None:
+            return None
+        
+        result = {}
+        if temp is not None:
+            result['temperature'] = float(temp)
+        if hum is not None:
+            result['humidity'] = float(hum)
+        if co2 is not None:
+            result['co2'] = float(co2)
+        
+        if source_data:
+            try:
+                source_info = json.loads(source_data)
+                result['source'] = source_info.get('source', 'unknown')
+                result['timestamp_ms'] = source_info.get('timestamp', 0)
+            except (json.JSONDecodeError, TypeError):
+                pass
+        
+        return result if result else None
+    
     def write_setpoint(
         self,
         location: str,
@@ -569,6 +623,56 @@ class AutomationRedisClient:
             logger.warning(f"Error writing alarm to Redis: {e}")
             return False
     
+    def write_alarms(self, alarms: List[Tuple[str, str, str, str, str]]) -> bool:
+        """Write several alarms to Redis in two round trips (MGET + pipelined SETs).
+        
+        Args:
+            alarms: List of (location, cluster, alarm_name, severity, message) tuples
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.redis_enabled or not self.redis_client:
+            return False
+        if not alarms:
+            return True
+        
+        try:
+            alarm_keys = [f"alarm:{location}:{cluster}:{alarm_name}" for location, cluster, alarm_name, _, _ in alarms]
+            timestamp_ms = int(datetime.now().timestamp() * 1000)
+            
+            # Keep 'since' of alarms that already exist
+            existing_values = self.redis_client.mget(alarm_keys)
+            
+            pipe = self.redis_client.pipeline()
+            for alarm_key, existing_data, (location, cluster, alarm_name, severity, message) in zip(
+                alarm_keys, existing_values, alarms
+            ):
+                since = json.loads(existing_data).get('since', timestamp_ms) if existing_data else timestamp_ms
+                alarm_data = {
+                    'active': True,
+                    'severity': severity,
+                    'message': message,
+                    'since': since,
+                    'acknowledged': False
+                }
+                # No TTL - alarms persist until explicitly cleared
+                pipe.set(alarm_key, json.dumps(alarm_data))
+            pipe.execute()
+            
+            for location, cluster, alarm_name, severity, message in alarms:
+                if severity == 'critical':
+                    logger.error(f"CRITICAL ALARM: {location}/{cluster}/{alarm_name}: {message}")
+                elif severity == 'warning':
+                    logger.warning(f"WARNING ALARM: {location}/{cluster}/{alarm_name}: {message}")
+                else:
+                    logger.info(f"INFO ALARM: {location}/{cluster}/{alarm_name}: {message}")
+            
+            return True
+        except Exception as e:
+            logger.warning(f"Error writing alarms to Redis: {e}")
+            return False
+    
     def acknowledge_alarm(
         self,
         location: str,
@@ -773,6 +877,37 @@ class AutomationRedisClient:
             logger.debug(f"Error writing last good value: {e}")
             return False
     
+    def write_last_good_values(self, values: List[Tuple[str, str, float]]) -> bool:
+        """Write several last good sensor values to Redis in one pipeline.
+        
+        Args:
+            values: List of (cluster, sensor_name, value) tuples
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.redis_enabled or not self.redis_client:
+            return False
+        if not values:
+            return True
+        
+        try:
+            timestamp_ms = int(datetime.now().timestamp() * 1000)
+            ttl = 40  # Default hold period (30s) + buffer (10s), as in write_last_good_value
+            
+            pipe = self.redis_client.pipeline()
+            for cluster, sensor_name, value in values:
+                last_good_data = {
+                    'value': value,
+                    'timestamp': timestamp_ms
+                }
+                pipe.setex(f"sensor:{cluster}:{sensor_name}:last_good", ttl, json.dumps(last_good_data))
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.debug(f"Error writing last good values: {e}")
+            return False
+    
     def read_last_good_value(self, cluster: str, sensor_name: str) -> Optional[Dict[str, Any]]:
         """Read last good sensor value from Redis.
         
@@ -817,18 +952,86 @@ class AutomationRedisClient:
         
         try:
             last_good = self.read_last_good_value(cluster, sensor_name)
-            if last_good is None:
-                return False, None
-            
-            timestamp_ms = last_good.get('timestamp', 0)
-            now_ms = int(datetime.now().timestamp() * 1000)
-            age_seconds = (now_ms - timestamp_ms) / 1000.0
-            
-            return age_seconds <= max_age_seconds, age_seconds
+            return self.last_good_age(last_good, max_age_seconds)
         except Exception as e:
             logger.debug(f"Error checking last good age: {e}")
             return False, None
     
+    def last_good_age(
+        self,
+        last_good: Optional[Dict[str, Any]],
+        max_age_seconds: int = 30
+    ) -> Tuple[bool, Optional[float]]:
+        """Check an already-read last good value against an age limit.
+        
+        Args:
+            last_good: Dict with 'value' and 'timestamp', or None
+            max_age_seconds: Maximum age in seconds to consider value valid
+        
+        Returns:
+            Tuple of (is_valid, age_seconds)
+        """
+        if last_good is None:
+            return False, None
+        
+        timestamp_ms = last_good.get('timestamp', 0)
+        now_ms = int(datetime.now().timestamp() * 1000)
+        age_seconds = (now_ms - timestamp_ms) / 1000.0
+        
+        return age_seconds <= max_age_seconds, age_seconds
+    
+    def read_cluster_state(
+        self,
+        location: str,
+        cluster: str,
+        sensor_names: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """Read mode, failsafe and last good sensor values for a cluster in one MGET.
+        
+        Args:
+            location: Location name
+            cluster: Cluster name
+            sensor_names: Sensors whose last good values should be read
+        
+        Returns:
+            Dict with 'mode' (str or None), 'failsafe' (dict or None) and
+            'last_good' (sensor name -> dict or None), or None if Redis is disabled
+        """
+        if not self.redis_enabled or not self.redis_client:
+            return None
+        
+        keys = [f"mode:{location}:{cluster}", f"failsafe:{location}:{cluster}"]
+        keys.extend(f"sensor:{cluster}:{sensor_name}:last_good" for sensor_name in sensor_names)
+        try:
+            values = self.redis_client.mget(keys)
+        except Exception as e:
+            # Same outcome as the individual reads failing
+            logger.warning(f"Error reading cluster state from Redis: {e}")
+            return {'mode': None, 'failsafe': None, 'last_good': {}}
+        
+        mode, failsafe_data, *last_good_values = values
+        
+        failsafe = None
+        if failsafe_data:
+            try:
+                failsafe = json.loads(failsafe_data)
+            except ValueError as e:
+                logger.debug(f"Error reading failsafe: {e}")
+        
+        last_good: Dict[str, Optional[Dict[str, Any]]] = {}
+        for sensor_name, last_good_data in zip(sensor_names, last_good_values):
+            try:
+                last_good[sensor_name] = json.loads(last_good_data) if last_good_data else None
+            except ValueError as e:
+                logger.debug(f"Error reading last good value: {e}")
+                last_good[sensor_name] = None
+        
+        return {
+            'mode': mode if mode else None,
+            'failsafe': failsafe,
+            'last_good': last_good
+        }
+    
     # ========== PID Parameter Cache ==========
     
     def read_pid_parameters(self, device_type: str) -> Optional[Dict[str, Any]]:
@@ -853,6 +1056,29 @@ class AutomationRedisClient:
             logger.debug(f"Error reading PID parameters from Redis: {e}")
         return None
     
+    def read_pid_parameters_bulk(self, device_types: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Read PID parameters for several device types with a single MGET.
+        
+        Args:
+            device_types: Device types (e.g., ['heater', 'co2'])
+        
+        Returns:
+            Dict mapping device_type to parameter dict (missing types are omitted)
+        """
+        if not self.redis_enabled or not self.redis_client or not device_types:
+            return {}
+        
+        try:
+            pid_keys = [f"pid:parameters:{device_type}" for device_type in device_types]
+            results = {}
+            for device_type, pid_data in zip(device_types, self.redis_client.mget(pid_keys)):
+                if pid_data:
+                    results[device_type] = json.loads(pid_data)
+            return results
+        except Exception as e:
+            logger.debug(f"Error reading PID parameters from Redis: {e}")
+        return {}
+    
     def write_pid_parameters(
         self,
         device_type: str,
@@ -891,11 +1117,73 @@ class AutomationRedisClient:
                 'updated_at': timestamp_ms
             }
             
-            self.redis_client.setex(pid_key, pid_ttl, json.dumps(pid_data))
+            pipe = self.redis_client.pipeline()
+            pipe.setex(pid_key, pid_ttl, json.dumps(pid_data))
+            pipe.publish(PID_CHANGED_CHANNEL, device_type)
+            pipe.execute()
             return True
         except Exception as e:
             logger.warning(f"Error writing PID parameters to Redis: {e}")
             return False
+    
+    # ========== Change Notifications ==========
+    
+    def subscribe(self, *channels: str) -> Optional[Any]:
+        """Subscribe to change notification channels.
+        
+        Args:
+            channels: Channel names (e.g., PID_CHANGED_CHANNEL)
+        
+        Returns:
+            PubSub object, or None if Redis unavailable
+        """
+        if not self.redis_enabled or not self.redis_client:
+            return None
+        
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(*channels)
+            return pubsub
+        except Exception as e:
+            logger.warning(f"Error subscribing to Redis channels {channels}: {e}")
+            return None
+    
+    def wait_for_messages(
+        self,
+        pubsub: Any,
+        timeout: float,
+        keep_waiting: Optional[Callable[[], bool]] = None,
+        poll_interval: float = 1.0
+    ) -> List[str]:
+        """Block until a notification arrives or timeout expires, then drain pending ones.
+        
+        Waits in slices of at most poll_interval seconds, so a caller running
+        this in a worker thread can stop it promptly through keep_waiting.
+        
+        Args:
+            pubsub: PubSub object from subscribe()
+            timeout: Maximum time to wait in seconds
+            keep_waiting: Optional callable checked between slices; stop waiting
+                once it returns False
+            poll_interval: Longest single blocking read in seconds
+        
+        Returns:
+            List of message payloads (empty on timeout or when stopped)
+        """
+        deadline = time.monotonic() + timeout
+        message = None
+        while message is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (keep_waiting is not None and not keep_waiting()):
+                break
+            message = pubsub.get_message(timeout=min(poll_interval, remaining))
+        
+        payloads = []
+        while message is not None:
+            if message.get('type') == 'message':
+                payloads.append(message['data'])
+            message = pubsub.get_message(timeout=0)
+        return payloads
 
     # ========== Light Intensity Management ==========
     
@@ -945,6 +1233,43 @@ class AutomationRedisClient:
             logger.warning(f"Error writing light intensity to Redis: {e}")
             return False
     
+    def write_light_intensities(
+        self,
+        lights: List[Tuple[str, str, str, float, float, int, int]]
+    ) -> bool:
+        """Write several light intensities to Redis in one pipeline (persistent, no TTL).
+        
+        Args:
+            lights: List of tuples in write_light_intensity argument order
+                (location, cluster, device_name, intensity, voltage, board_id, channel)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.redis_enabled or not self.redis_client:
+            return False
+        if not lights:
+            return True
+        
+        try:
+            timestamp_ms = int(datetime.now().timestamp() * 1000)
+            
+            pipe = self.redis_client.pipeline()
+            for location, cluster, device_name, intensity, voltage, board_id, channel in lights:
+                light_data = {
+                    'intensity': intensity,
+                    'voltage': voltage,
+                    'board_id': board_id,
+                    'channel': channel,
+                    'timestamp_ms': timestamp_ms
+                }
+                pipe.set(f"light:{location}:{cluster}:{device_name}", json.dumps(light_data))
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Error writing light intensities to Redis: {e}")
+            return False
+    
     def read_light_intensity(
         self,
         location: str,
@@ -44,7 +44,16 @@ async def get_alarms(
     return {
         "location": location,
         "cluster": cluster,
-        "alarms": alarms
+        "alarms": {
+            alarm.alarm_name: {
+                "active": alarm.active,
+                "severity": alarm.severity,
+                "message": alarm.message,
+                "since": alarm.since,
+                "acknowledged": alarm.acknowledged
+            }
+            for alarm in alarms.values()
+        }
     }
 
 
@@ -66,10 +75,10 @@ async def get_all_alarms(
     
     # Group by location:cluster
     grouped = {}
-    for key, alarm_data in all_alarms.items():
-        loc = alarm_data.get('location', '')
-        clust = alarm_data.get('cluster', '')
-        alarm_name = alarm_data.get('alarm_name', '')
+    for alarm in all_alarms.values():
+        loc = alarm.location
+        clust = alarm.cluster
+        alarm_name = alarm.alarm_name
         
         group_key = f"{loc}:{clust}"
         if group_key not in grouped:
@@ -79,7 +88,14 @@ async def get_all_alarms(
                 "alarms": {}
             }
         
-        grouped[group_key]["alarms"][alarm_name] = alarm_data
+        grouped[group_key]["alarms"][alarm_name] = {
+            "location": loc,
+            "cluster": clust,
+            "alarm_name": alarm_name,
+            "severity": alarm.severity,
+            "message": alarm.message,
+            "active": alarm.active
+        }
     
     return grouped
 
@@ -85,8 +85,7 @@ async def set_intensity(
         )
     
     # Get device configuration
-    devices = config.get_devices()
-    device_info = devices.get(location, {}).get(cluster, {}).get(device_name)
+    device_info = config.get_device_info(location, cluster, device_name)
     
     if not device_info:
         raise HTTPException(
@@ -182,8 +181,7 @@ async def get_light_status(
 ) -> Dict[str, Any]:
     """Get current light status (intensity, voltage, board info)."""
     # Get device configuration
-    devices = config.get_devices()
-    device_info = devices.get(location, {}).get(cluster, {}).get(device_name)
+    device_info = config.get_device_info(location, cluster, device_name)
     
     if not device_info:
         raise HTTPException(
@@ -268,8 +266,7 @@ async def set_voltage(
         )
     
     # Get device configuration
-    devices = config.get_devices()
-    device_info = devices.get(location, {}).get(cluster, {}).get(device_name)
+    device_info = config.get_device_info(location, cluster, device_name)
     
     if not device_info:
         raise HTTPException(
@@ -0,0 +1 @@
+"""Tests for the automation service."""
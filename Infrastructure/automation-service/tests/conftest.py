@@ -0,0 +1,6 @@
+"""Shared pytest setup for the automation service tests."""
+import sys
+from pathlib import Path
+
+# Make the service's app package importable when running pytest from this directory
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,133 @@
+"""Tests for InterlockManager per-device and global interlocks."""
+from app.automation.interlock_manager import InterlockManager
+
+LOCATION = "Flower Room"
+CLUSTER = "main"
+
+
+def _key(device_name):
+    return (LOCATION, CLUSTER, device_name)
+
+
+def _device_config(heater_max_load=None):
+    heater = {'interlock_with': ['cooler']}
+    cooler = {'interlock_with': ['heater']}
+    if heater_max_load is not None:
+        heater['interlock_max_allowed_load'] = heater_max_load
+    return {LOCATION: {CLUSTER: {'heater': heater, 'cooler': cooler, 'fan': {}}}}
+
+
+class _LoadCallback:
+    """Device load callback that records each lookup."""
+    
+    def __init__(self, loads):
+        self.loads = loads
+        self.calls = []
+    
+    def __call__(self, location, cluster, device_name):
+        self.calls.append((location, cluster, device_name))
+        return self.loads.get(device_name)
+
+
+def test_interlocked_device_on_blocks_without_load_callback():
+    manager = InterlockManager(_device_config(), [])
+    
+    allowed, reason = manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1})
+    
+    assert not allowed
+    assert reason == "Interlock: heater is ON"
+
+
+def test_interlocked_device_off_does_not_block():
+    manager = InterlockManager(_device_config(), [])
+    
+    assert manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 0}) == (True, None)
+    assert manager.check_interlock(LOCATION, CLUSTER, 'cooler', {}) == (True, None)
+    assert manager.check_interlock(LOCATION, CLUSTER, 'fan', {_key('heater'): 1}) == (True, None)
+
+
+def test_load_below_max_allowed_does_not_block():
+    manager = InterlockManager(_device_config(heater_max_load=30.0), [], _LoadCallback({'heater': 25.0}))
+    
+    assert manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1}) == (True, None)
+
+
+def test_load_above_max_allowed_blocks():
+    manager = InterlockManager(_device_config(heater_max_load=30.0), [], _LoadCallback({'heater': 45.0}))
+    
+    allowed, reason = manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1})
+    
+    assert not allowed
+    assert reason == "Interlock: heater is at 45.0% (max allowed: 30.0%)"
+
+
+def test_unknown_load_falls_back_to_on_off_check():
+    manager = InterlockManager(_device_config(heater_max_load=30.0), [], _LoadCallback({}))
+    
+    allowed, reason = manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1})
+    
+    assert not allowed
+    assert reason == "Interlock: heater is ON"
+
+
+def test_shared_load_cache_fetches_each_load_once():
+    callback = _LoadCallback({'heater': 45.0})
+    manager = InterlockManager(_device_config(heater_max_load=30.0), [], callback)
+    device_states = {_key('heater'): 1}
+    load_cache = {}
+    
+    first = manager.check_interlock(LOCATION, CLUSTER, 'cooler', device_states, load_cache=load_cache)
+    second = manager.check_interlock(LOCATION, CLUSTER, 'cooler', device_states, load_cache=load_cache)
+    
+    assert first == second
+    assert not first[0]
+    assert callback.calls == [_key('heater')]
+    assert load_cache == {_key('heater'): 45.0}
+
+
+def test_load_cache_memoizes_unknown_loads():
+    callback = _LoadCallback({})
+    manager = InterlockManager(_device_config(), [], callback)
+    load_cache = {}
+    
+    for _ in range(3):
+        manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1}, load_cache=load_cache)
+    
+    assert callback.calls == [_key('heater')]
+    assert load_cache == {_key('heater'): None}
+
+
+def test_without_shared_cache_each_call_fetches_load():
+    callback = _LoadCallback({'heater': 45.0})
+    manager = InterlockManager(_device_config(heater_max_load=30.0), [], callback)
+    
+    manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1})
+    manager.check_interlock(LOCATION, CLUSTER, 'cooler', {_key('heater'): 1})
+    
+    assert len(callback.calls) == 2
+
+
+def test_global_interlock_blocks_then_device():
+    rules = [{'when_device': 'dehumidifier', 'then_device': 'humidifier'}]
+    manager = InterlockManager({}, rules)
+    
+    allowed, reason = manager.check_interlock(LOCATION, CLUSTER, 'humidifier', {_key('dehumidifier'): 1})
+    
+    assert not allowed
+    assert reason == "Global interlock: dehumidifier is ON"
+    assert manager.check_interlock(LOCATION, CLUSTER, 'humidifier', {_key('dehumidifier'): 0}) == (True, None)
+
+
+def test_global_interlock_respects_max_allowed_load():
+    rules = [{'when_device': 'dehumidifier', 'then_device': 'humidifier', 'max_allowed_load': 50.0}]
+    callback = _LoadCallback({'dehumidifier': 40.0})
+    manager = InterlockManager({}, rules, callback)
+    device_states = {_key('dehumidifier'): 1}
+    
+    assert manager.check_interlock(LOCATION, CLUSTER, 'humidifier', device_states) == (True, None)
+    
+    callback.loads['dehumidifier'] = 80.0
+    allowed, reason = manager.check_interlock(LOCATION, CLUSTER, 'humidifier', device_states)
+    
+    assert not allowed
+    assert reason == "Global interlock: dehumidifier is at 80.0% (max allowed: 50.0%)"
@@ -0,0 +1,151 @@
+"""Tests for RulesEngine rule ordering and matching."""
+from datetime import datetime
+
+from app.automation.rules_engine import RulesEngine
+from app.control.scheduler import Scheduler
+
+LOCATION = "Flower Room"
+CLUSTER = "main"
+NOON = datetime(2026, 1, 5, 12, 0)
+
+
+def _rule(rule_id, sensor, op, value, device, state=1, priority=0, **extra):
+    rule = {
+        'id': rule_id,
+        'location': LOCATION,
+        'cluster': CLUSTER,
+        'condition_sensor': sensor,
+        'condition_operator': op,
+        'condition_value': value,
+        'action_device': device,
+        'action_state': state,
+        'priority': priority,
+    }
+    rule.update(extra)
+    return rule
+
+
+def _engine(rules, schedules=()):
+    return RulesEngine(rules, Scheduler(list(schedules)))
+
+
+def test_highest_priority_match_wins_regardless_of_config_order():
+    engine = _engine([
+        _rule(1, 'temperature', '>', 25.0, 'fan', priority=1),
+        _rule(2, 'temperature', '>', 20.0, 'heater', state=0, priority=10),
+        _rule(3, 'humidity', '>', 50.0, 'dehumidifier', priority=5),
+    ])
+    
+    result = engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0, 'humidity': 70.0}, NOON)
+    
+    assert result == ('heater', 0, 2)
+
+
+def test_equal_priority_keeps_config_order():
+    engine = _engine([
+        _rule(1, 'temperature', '>', 25.0, 'fan', priority=3),
+        _rule(2, 'temperature', '>', 20.0, 'heater', priority=3),
+    ])
+    
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, NOON) == ('fan', 1, 1)
+    # Only the second rule matches below the first rule's threshold
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 22.0}, NOON) == ('heater', 1, 2)
+
+
+def test_missing_priority_sorts_as_zero():
+    engine = _engine([
+        _rule(1, 'temperature', '>', 20.0, 'fan', priority=None),
+        _rule(2, 'temperature', '>', 20.0, 'heater', priority=-1),
+    ])
+    
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, NOON) == ('fan', 1, 1)
+
+
+def test_missing_sensor_value_falls_through_to_next_rule():
+    engine = _engine([
+        _rule(1, 'co2', '<', 800.0, 'co2_valve', priority=10),
+        _rule(2, 'temperature', '>', 25.0, 'fan', priority=1),
+    ])
+    
+    result = engine.evaluate(LOCATION, CLUSTER, {'co2': None, 'temperature': 30.0}, NOON)
+    
+    assert result == ('fan', 1, 2)
+
+
+def test_disabled_and_unknown_operator_rules_are_skipped():
+    engine = _engine([
+        _rule(1, 'temperature', '>', 20.0, 'fan', priority=10, enabled=False),
+        _rule(2, 'temperature', '!=', 20.0, 'fan', priority=9),
+        _rule(3, 'temperature', '>', 20.0, 'heater', priority=1),
+    ])
+    
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, NOON) == ('heater', 1, 3)
+
+
+def test_equality_operator_uses_tolerance():
+    engine = _engine([_rule(1, 'ph', '==', 6.0, 'dosing_pump')])
+    
+    assert engine.evaluate(LOCATION, CLUSTER, {'ph': 6.005}, NOON) == ('dosing_pump', 1, 1)
+    assert engine.evaluate(LOCATION, CLUSTER, {'ph': 6.02}, NOON) is None
+
+
+def test_rules_are_scoped_to_location_and_cluster():
+    engine = _engine([_rule(1, 'temperature', '>', 20.0, 'fan')])
+    
+    assert engine.evaluate(LOCATION, 'other', {'temperature': 30.0}, NOON) is None
+    assert engine.evaluate('Veg Room', CLUSTER, {'temperature': 30.0}, NOON) is None
+
+
+def test_scheduled_rule_only_matches_while_its_schedule_is_active():
+    schedules = [{
+        'id': 7,
+        'location': LOCATION,
+        'cluster': CLUSTER,
+        'device_name': 'fan',
+        'start_time': '08:00',
+        'end_time': '18:00',
+    }]
+    engine = _engine([
+        _rule(1, 'temperature', '>', 25.0, 'fan', priority=10, schedule_id=7),
+        _rule(2, 'temperature', '>', 25.0, 'heater', state=0, priority=1),
+    ], schedules)
+    
+    assert engine.has_scheduled_rules(LOCATION, CLUSTER)
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, NOON) == ('fan', 1, 1)
+    night = datetime(2026, 1, 5, 22, 0)
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, night) == ('heater', 0, 2)
+
+
+def test_scheduled_rule_requires_matching_schedule_id():
+    schedules = [{
+        'id': 8,
+        'location': LOCATION,
+        'cluster': CLUSTER,
+        'device_name': 'fan',
+        'start_time': '00:00',
+        'end_time': '23:59',
+    }]
+    engine = _engine([_rule(1, 'temperature', '>', 25.0, 'fan', schedule_id=7)], schedules)
+    
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, NOON) is None
+
+
+def test_evaluate_all_returns_only_the_winning_rule():
+    engine = _engine([
+        _rule(1, 'temperature', '>', 25.0, 'fan', priority=5),
+        _rule(2, 'humidity', '>', 50.0, 'dehumidifier', priority=1),
+    ])
+    
+    result = engine.evaluate_all(LOCATION, CLUSTER, {'temperature': 30.0, 'humidity': 70.0}, NOON)
+    
+    assert result == {'fan': (1, 1)}
+
+
+def test_update_rules_rebuilds_index():
+    engine = _engine([_rule(1, 'temperature', '>', 25.0, 'fan')])
+    version = engine.version
+    
+    engine.update_rules([_rule(2, 'temperature', '>', 25.0, 'heater')])
+    
+    assert engine.version == version + 1
+    assert engine.evaluate(LOCATION, CLUSTER, {'temperature': 30.0}, NOON) == ('heater', 1, 2)
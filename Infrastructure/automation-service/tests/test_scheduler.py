@@ -0,0 +1,107 @@
+"""Tests for Scheduler bulk lookups against the per-device lookups."""
+from datetime import datetime, timedelta
+
+from app.control.scheduler import Scheduler
+
+LOCATION = "Flower Room"
+CLUSTER = "main"
+DEVICES = ('light', 'fan', 'pump', 'heater', 'co2_valve', 'unscheduled')
+
+
+def _schedule(schedule_id, device_name, start_time, end_time, **extra):
+    schedule = {
+        'id': schedule_id,
+        'location': LOCATION,
+        'cluster': CLUSTER,
+        'device_name': device_name,
+        'start_time': start_time,
+        'end_time': end_time,
+        'ramp_up_duration': 15,
+        'ramp_down_duration': 30,
+    }
+    schedule.update(extra)
+    return schedule
+
+
+SCHEDULES = [
+    _schedule(1, 'light', '06:00', '18:00'),
+    # Overnight schedule
+    _schedule(2, 'fan', '22:00', '06:00'),
+    # Overlapping schedules for one device; the first active one wins
+    _schedule(3, 'pump', '08:00', '12:00', day_of_week=0),
+    _schedule(4, 'pump', '10:00', '14:00'),
+    _schedule(5, 'pump', '09:00', '11:00'),
+    # Disabled and malformed schedules never apply
+    _schedule(6, 'heater', '00:00', '23:59', enabled=False),
+    _schedule(7, 'heater', 'bad', '12:00'),
+    _schedule(8, 'co2_valve', '07:30', '07:45', day_of_week=2),
+    # Another cluster and location must not leak into the bulk result
+    dict(_schedule(9, 'light', '00:00', '23:59'), cluster='other'),
+    dict(_schedule(10, 'fan', '00:00', '23:59'), location='Veg Room'),
+]
+
+
+def _times():
+    """Every 15 minutes over a week, plus the edges of each schedule."""
+    start = datetime(2026, 1, 5)  # A Monday
+    current = start
+    while current < start + timedelta(days=7):
+        yield current
+        current += timedelta(minutes=15)
+    for day in range(7):
+        for hour, minute in ((5, 59), (6, 0), (7, 44), (7, 45), (17, 59), (18, 0), (21, 59), (23, 59)):
+            yield start + timedelta(days=day, hours=hour, minutes=minute)
+
+
+def test_bulk_states_match_per_device_lookups():
+    scheduler = Scheduler(SCHEDULES)
+    
+    for current_time in _times():
+        bulk = scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, current_time)
+        
+        for device_name in DEVICES:
+            state = scheduler.get_schedule_state(LOCATION, CLUSTER, device_name, current_time)
+            is_active, schedule_id = scheduler.is_schedule_active(LOCATION, CLUSTER, device_name, current_time)
+            details = scheduler.get_active_schedule_details(LOCATION, CLUSTER, device_name, current_time)
+            
+            if state is None:
+                assert device_name not in bulk, (device_name, current_time)
+                assert details is None
+            else:
+                assert bulk[device_name] == (state, schedule_id, details), (device_name, current_time)
+                assert is_active
+        
+        assert set(bulk) <= set(DEVICES)
+
+
+def test_bulk_states_pick_first_active_schedule():
+    scheduler = Scheduler(SCHEDULES)
+    
+    monday = scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, datetime(2026, 1, 5, 10, 30))
+    tuesday = scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, datetime(2026, 1, 6, 10, 30))
+    
+    assert monday['pump'][1] == 3
+    assert tuesday['pump'][1] == 4
+
+
+def test_bulk_states_handle_overnight_schedules():
+    scheduler = Scheduler(SCHEDULES)
+    
+    late = scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, datetime(2026, 1, 5, 23, 0))
+    early = scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, datetime(2026, 1, 6, 5, 0))
+    day = scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, datetime(2026, 1, 6, 12, 0))
+    
+    assert late['fan'][:2] == (1, 2)
+    assert early['fan'][:2] == (1, 2)
+    assert late['fan'][2]['photoperiod_hours'] == 8.0
+    assert 'fan' not in day
+
+
+def test_bulk_states_follow_update_schedules():
+    scheduler = Scheduler(SCHEDULES)
+    noon = datetime(2026, 1, 5, 12, 0)
+    assert 'light' in scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, noon)
+    
+    scheduler.update_schedules([_schedule(11, 'heater', '11:00', '13:00')])
+    
+    assert set(scheduler.get_schedule_states_bulk(LOCATION, CLUSTER, noon)) == {'heater'}